@@ -0,0 +1,535 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Benchmarks
+
+# Run with `python benchmark.py`. Nothing is executed on import.
+# - run_suite times every engine on synthetic corpora of controlled sizes and repetition rates: each case gets
+#   warmup runs, then repeated runs timed with perf_counter_ns, reported as median and p95, plus the peak memory
+#   of one more run traced with tracemalloc.
+# - `python benchmark.py --output results.json` writes the results as JSON, and `--compare baseline.json`
+#   lists the cases whose median got slower than the baseline by more than the tolerance.
+# - `python benchmark.py --tables` prints the comparison tables of the earlier changes instead.
+
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from plagiarism_detector.chaining import regular_get_match
+from plagiarism_detector.kgram_index import KGramIndex
+from plagiarism_detector.match_spans import MatchCollector
+from plagiarism_detector.matchers import (ENGINES, build_index, choose_engine, compact_get_match, index_get_match,
+                                          multi_get_match, sam_get_match, vector_get_match)
+from plagiarism_detector.open_addressing import (HashTable, process_string, rh_get_match, rolling_hashing,
+                                                 rolling_table_size, str_to_int)
+from plagiarism_detector.parallel import parallel_build_index, parallel_get_match
+from plagiarism_detector.rolling_hash import fingerprint_stream, iter_fingerprints, rolling_fingerprints
+from plagiarism_detector.stats import MatchStats
+from plagiarism_detector.vectorized import load_numpy, vector_fingerprints
+
+
+def synthetic_text(length, seed=0):
+    """
+    Generate English-like text made of random common words.
+
+    Input:
+        - length: int, number of characters to generate
+        - seed: seed of the random generator
+    Output:
+        - text: string of the requested length
+    """
+    words = ["the", "and", "of", "court", "law", "system", "case", "science", "world", "time",
+             "students", "civil", "family", "spend", "almost", "their", "community", "knows",
+             "assumption", "activity", "scientists", "jurisdiction", "particular", "refers"]
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total <= length:
+        word = rng.choice(words)
+        parts.append(word)
+        total += len(word) + 1
+    return " ".join(parts)[:length]
+
+def count_probes(x, y, k, key_function):
+    """
+    Insert every k-gram of x and search every k-gram of y, counting probes.
+
+    Input:
+        - x, y: strings
+        - k: length of substring
+        - key_function: function mapping (string, k) to the list of keys of its k-grams
+    Output:
+        - insert_probes, search_probes: total probes of each phase
+    """
+    x, y = process_string(x, y)
+    table = HashTable(rolling_table_size(len(x) - k + 1))
+
+    for i, key in enumerate(key_function(x, k)):
+        table.open_addressing_insert(key, x[i:i+k], i)
+    insert_probes = table.probes
+
+    table.probes = 0
+    for j, key in enumerate(key_function(y, k)):
+        table.open_addressing_search(key, y[j:j+k])
+    return insert_probes, table.probes
+
+def legacy_keys(s, k):
+    #the keys rh_get_match used before the Rabin-Karp engine: only ten distinct values
+    return [str_to_int(s[i:i+k]) % 10 for i in range(len(s)-k+1)]
+
+def probe_benchmark(lengths=(1000, 5000, 20000), k=8):
+    """
+    Print probes per insert and per search for the old mod-10 keys and the 64-bit fingerprints.
+    """
+    print("length | keys        | probes/insert | probes/search")
+    for length in lengths:
+        x = synthetic_text(length, seed=1)
+        y = synthetic_text(length, seed=2)
+        windows = len(x.replace(" ", "")) - k + 1
+        for name, keys in (("mod 10", legacy_keys), ("rabin-karp", rolling_hashing)):
+            insert_probes, search_probes = count_probes(x, y, k, keys)
+            print("%6d | %-11s | %13.2f | %13.2f" % (length, name, insert_probes / windows, search_probes / windows))
+
+def random_text(length, seed=0):
+    """
+    Generate random lowercase letters, where almost every 8-gram is distinct, like real prose.
+    """
+    rng = random.Random(seed)
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(length))
+
+def traced_memory(function, *args):
+    """
+    Run function while tracing allocations.
+
+    Output:
+        - retained: bytes still allocated when function returns (the size of its result)
+        - peak: highest number of bytes allocated during the call
+        - result: return value of function
+    """
+    tracemalloc.start()
+    result = function(*args)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained, peak, result
+
+def build_node_table(x, k):
+    table = HashTable(rolling_table_size(len(x) - k + 1))
+    for i, key in iter_fingerprints(x, k):
+        table.open_addressing_insert(key, x[i:i+k], i)
+    return table
+
+def memory_benchmark(lengths=(10000, 50000), k=8):
+    """
+    Print the memory of indexing x with HashTableNode objects and with the array-backed KGramIndex.
+    """
+    print("length | HashTable retained/peak (KB) | KGramIndex retained/peak (KB)")
+    for length in lengths:
+        x = random_text(length, seed=1)
+        tableRetained, tablePeak, _ = traced_memory(build_node_table, x, k)
+        indexRetained, indexPeak, _ = traced_memory(KGramIndex.from_text, x, k)
+        print("%6d | %13.1f / %12.1f | %14.1f / %12.1f" % (length, tableRetained / 1024, tablePeak / 1024,
+                                                           indexRetained / 1024, indexPeak / 1024))
+
+def plagiarized_pair(length, copied=0.3, seed=0):
+    """
+    Generate a reference text x and a submission y that copies passages of x.
+
+    Input:
+        - length: int, length of both texts
+        - copied: fraction of y made of passages copied from x
+    Output:
+        - x, y: strings
+    """
+    rng = random.Random(seed)
+    x = random_text(length, seed=seed)
+    y = random_text(length, seed=seed+1)
+    #replace 100-character blocks of y with blocks of x
+    for _ in range(int(length * copied) // 100):
+        start = rng.randrange(0, max(1, length - 100))
+        at = rng.randrange(0, max(1, length - 100))
+        y = y[:at] + x[start:start+100] + y[at+100:]
+    return x, y
+
+def winnowing_benchmark(length=50000, k=8, windows=(None, 4, 8, 16)):
+    """
+    Print index size and query throughput of the full k-gram mode (w = None) and of winnowing.
+    """
+    x, y = process_string(*plagiarized_pair(length))
+    print("w    | indexed k-grams | index KB | query chars/s | matches")
+    for w in windows:
+        index = KGramIndex.from_text(x, k, w)
+        #time the search phase alone
+        start = time.perf_counter()
+        matches = 0
+        for j, key in fingerprint_stream(y, k, w):
+            indexes = index.search(key, y[j:j+k])
+            if indexes:
+                matches += len(indexes)
+        elapsed = time.perf_counter() - start
+        print("%-4s | %15d | %8.1f | %13.0f | %7d" % (w, len(index), index.nbytes() / 1024,
+                                                     len(y) / elapsed, matches))
+
+def parallel_benchmark(length=200000, k=12, workers=(1, 2, 4, 8)):
+    """
+    Print the build and query times of build_index and index_get_match,
+    and of their parallel versions with more and more worker processes.
+    """
+    x, y = plagiarized_pair(length)
+    start = time.perf_counter()
+    index = build_index(x, k)
+    buildTime = time.perf_counter() - start
+    start = time.perf_counter()
+    serial = index_get_match(index, y, spans=True)
+    print("           | build    | query    | same as serial")
+    print("serial     | %6.2f s | %6.2f s |" % (buildTime, time.perf_counter() - start))
+    for n in workers:
+        start = time.perf_counter()
+        sharded = parallel_build_index(x, k, workers=n)
+        buildTime = time.perf_counter() - start
+        start = time.perf_counter()
+        matches = parallel_get_match(index, y, spans=True, workers=n)
+        queryTime = time.perf_counter() - start
+        same = sharded.fingerprints == index.fingerprints and sharded.positions == index.positions and matches == serial
+        print("%2d workers | %6.2f s | %6.2f s | %s" % (n, buildTime, queryTime, same))
+
+def vector_benchmark(lengths=(100000, 1000000), k=12):
+    """
+    Print the fingerprint throughput and the match time of the pure-Python and the NumPy paths.
+    """
+    np = load_numpy()
+    if np is None:
+        print("NumPy is not installed, skipping the vectorized benchmark")
+        return
+    print("length  | python Mchar/s | numpy Mchar/s | compact_get_match | vector_get_match")
+    for length in lengths:
+        x, y = plagiarized_pair(length)
+        processed, _ = process_string(x, y)
+        start = time.perf_counter()
+        rolling_fingerprints(processed, k)
+        pythonRate = len(processed) / (time.perf_counter() - start) / 1e6
+        start = time.perf_counter()
+        vector_fingerprints(np, processed, k)
+        numpyRate = len(processed) / (time.perf_counter() - start) / 1e6
+        start = time.perf_counter()
+        compact_get_match(x, y, k)
+        compactTime = time.perf_counter() - start
+        start = time.perf_counter()
+        vector_get_match(x, y, k)
+        vectorTime = time.perf_counter() - start
+        print("%7d | %14.2f | %13.2f | %15.2f s | %14.2f s" % (length, pythonRate, numpyRate, compactTime, vectorTime))
+
+def engine_benchmark(sizes=((100, 100), (1000, 1000), (10000, 10000), (100000, 100000),
+                            (100000, 1000), (1000, 100000)), k=12, repeat=3):
+    """
+    Print the best time of every matcher of get_match for x and y of several lengths,
+    and the engine choose_engine picks; the crossover points of choose_engine come from this table.
+    """
+    engines = [name for name in ENGINES if name != "vector" or load_numpy() is not None]
+    print("len(x)  | len(y)  | " + " | ".join("%9s" % name for name in engines) + " | chosen")
+    for xLength, yLength in sizes:
+        x, y = plagiarized_pair(max(xLength, yLength))
+        x = x[:xLength]
+        y = y[:yLength]
+        times = []
+        for name in engines:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                ENGINES[name](x, y, k)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            times.append(best)
+        print("%7d | %7d | " % (xLength, yLength) + " | ".join("%8.4fs" % t for t in times)
+              + " | " + choose_engine(xLength, yLength))
+
+def multi_k_benchmark(length=100000, ks=(6, 8, 12, 20), windows=(None, 4)):
+    """
+    Print the time of one rh_get_match per k against one multi_get_match for all of them.
+    """
+    x, y = plagiarized_pair(length)
+    print("w    | rh_get_match per k | multi_get_match | same")
+    for w in windows:
+        start = time.perf_counter()
+        separate = {k: rh_get_match(x, y, k, w=w) for k in ks}
+        separateTime = time.perf_counter() - start
+        start = time.perf_counter()
+        together = multi_get_match(x, y, ks, w=w)
+        togetherTime = time.perf_counter() - start
+        print("%-4s | %16.2f s | %13.2f s | %s" % (w, separateTime, togetherTime, separate == together))
+
+
+def build_position_table(x, k):
+    table = HashTable(rolling_table_size(len(x) - k + 1), text=x, k=k)
+    for i, key in iter_fingerprints(x, k):
+        table.position_insert(key, i)
+    return table
+
+def sliced_get_match(x, y, k):
+    #rh_get_match as it was before the position-only tables: every window of x and y is sliced,
+    #and the nodes keep the slices of x
+    x, y = process_string(x, y)
+    table = build_node_table(x, k)
+    dup = MatchCollector(k)
+    for j, key in iter_fingerprints(y, k):
+        indexes = table.open_addressing_search(key, y[j:j+k])
+        if indexes:
+            dup.add(j, indexes)
+    return dup.result()
+
+def slicing_benchmark(lengths=(100000, 500000), k=12, collisionProbability=1e-9):
+    """
+    Print what carrying positions instead of substrings saves in rh_get_match: the windows sliced, the memory
+    of the table, the peak memory of a call and its median time, for the old slicing path, the position-only
+    table that verifies fingerprint matches, and the fingerprint-only mode that does not.
+    """
+    print("length  | mode         | windows sliced | table KB | peak KB  | median s | same")
+    for length in lengths:
+        x, y = plagiarized_pair(length)
+        px, py = process_string(x, y)
+        xWindows = len(px) - k + 1
+        expected = sliced_get_match(x, y, k)
+        nodeTable = traced_memory(build_node_table, px, k)[0]
+        positionTable = traced_memory(build_position_table, px, k)[0]
+        #the position-only table slices a window only to verify two equal fingerprints
+        stats = MatchStats()
+        rh_get_match(x, y, k, stats=stats)
+        positionSlices = (xWindows - stats.keys) + stats.comparisons
+        modes = (("slices", sliced_get_match, (), xWindows + len(py) - k + 1, nodeTable),
+                 ("positions", rh_get_match, (), positionSlices, positionTable),
+                 ("fingerprints", rh_get_match, (False, None, False, None, None, collisionProbability), 0, positionTable))
+        for name, function, extra, sliced, table in modes:
+            timing = measure(function, x, y, k, *extra, repeat=3)
+            print("%7d | %-12s | %14d | %8.1f | %8.1f | %8.3f | %s" % (length, name, sliced, table / 1024,
+                                                                      timing["peak_bytes"] / 1024,
+                                                                      timing["median_ns"] / 1e9,
+                                                                      timing["result"] == expected))
+
+def repetitive_text(length, period=500, seed=0):
+    """
+    Generate an adversarial text: one random block of period letters repeated.
+    Every k-gram with k <= period occurs about length/period times, so a y of the same kind has
+    about length^2/period matching pairs and every table keeps long index lists.
+    """
+    unit = random_text(period, seed=seed)
+    return (unit * (length // period + 1))[:length]
+
+#default fraction of y copied from x in the plagiarized corpus, and block length of the repetitive corpus
+COPIED = 0.3
+PERIOD = 500
+
+#corpora of run_suite: name -> function (length, seed, copied, period) returning the pair x, y
+CORPORA = {
+    #English-like words, with the repeats of common words
+    "prose": lambda length, seed, copied = COPIED, period = PERIOD: (synthetic_text(length, seed),
+                                                                    synthetic_text(length, seed + 1)),
+    #almost every k-gram distinct, so almost no matches
+    "random": lambda length, seed, copied = COPIED, period = PERIOD: (random_text(length, seed),
+                                                                     random_text(length, seed + 1)),
+    #the fraction copied of y is taken from x in 100-character passages
+    "plagiarized": lambda length, seed, copied = COPIED, period = PERIOD: plagiarized_pair(length, copied, seed),
+    #x and y repeat the same block of period letters, the worst case for the index lists and the number of matches
+    "repetitive": lambda length, seed, copied = COPIED, period = PERIOD: (repetitive_text(length, period, seed),
+                                                                         repetitive_text(length, period, seed)),
+}
+
+#matchers of run_suite: the engines of get_match, the chaining table and the suffix automaton
+SUITE_ENGINES = dict(ENGINES, chaining=regular_get_match, automaton=sam_get_match)
+
+def percentile(samples, p):
+    """
+    Nearest-rank percentile.
+
+    Input:
+        - samples: list of numbers
+        - p: percentile between 0 and 100
+    Output:
+        - the smallest sample that is at least p% of the samples
+    """
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def measure(function, *args, warmup = 1, repeat = 5, memory = True):
+    """
+    Time a call the way timeit does: the garbage collector is off while the call runs.
+
+    Input:
+        - function, args: the call to time
+        - warmup: number of untimed calls first, to fill the caches and load lazy imports
+        - repeat: number of timed calls
+        - memory: if True, trace one more call with tracemalloc; tracing slows the call down, so it is not timed
+    Output:
+        - dictionary with the median, p95 and min times in nanoseconds, every sample,
+          the peak of traced bytes (None if memory is False) and the result of the last call
+    """
+    for _ in range(warmup):
+        result = function(*args)
+    samples = []
+    enabled = gc.isenabled()
+    for _ in range(repeat):
+        gc.disable()
+        try:
+            start = time.perf_counter_ns()
+            result = function(*args)
+            samples.append(time.perf_counter_ns() - start)
+        finally:
+            if enabled:
+                gc.enable()
+    peak = None
+    if memory:
+        _, peak, result = traced_memory(function, *args)
+    return {"median_ns": int(statistics.median(samples)), "p95_ns": percentile(samples, 95), "min_ns": min(samples),
+            "samples_ns": samples, "peak_bytes": peak, "result": result}
+
+def machine_info():
+    #what the numbers were measured on, so reports from different machines are not compared by mistake
+    np = load_numpy()
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "processor": platform.machine(), "cpus": os.cpu_count(),
+            "numpy": np.__version__ if np is not None else None}
+
+def run_suite(engines = None, corpora = None, lengths = (1000, 10000), k = 8, spans = False,
+              warmup = 1, repeat = 5, memory = True, seed = 0, copied = COPIED, period = PERIOD):
+    """
+    Time every engine on every corpus at every length.
+
+    Input:
+        - engines: names in SUITE_ENGINES, by default all of them; vector is skipped without NumPy
+        - corpora: names in CORPORA, by default all of them
+        - lengths: lengths of x and y
+        - k, spans: passed to every matcher
+        - warmup, repeat, memory: see measure
+        - seed: seed of the corpora
+        - copied: fraction of y copied from x in the plagiarized corpus
+        - period: length of the repeated block in the repetitive corpus
+    Output:
+        - report: dictionary with the machine info, the settings and one result per case, ready for json.dump
+    """
+    if engines is None:
+        engines = [name for name in SUITE_ENGINES if name != "vector" or load_numpy() is not None]
+    if corpora is None:
+        corpora = list(CORPORA)
+    for name in engines:
+        if name not in SUITE_ENGINES:
+            raise Exception("Unknown engine %r, expected one of %s!" % (name, ", ".join(SUITE_ENGINES)))
+    for name in corpora:
+        if name not in CORPORA:
+            raise Exception("Unknown corpus %r, expected one of %s!" % (name, ", ".join(CORPORA)))
+
+    results = []
+    for corpus in corpora:
+        for length in lengths:
+            x, y = CORPORA[corpus](length, seed, copied, period)
+            for engine in engines:
+                timing = measure(SUITE_ENGINES[engine], x, y, k, spans, warmup = warmup, repeat = repeat, memory = memory)
+                result = timing.pop("result")
+                results.append(dict(engine=engine, corpus=corpus, length=length, matches=len(result), **timing))
+    return {"machine": machine_info(), "k": k, "spans": spans, "warmup": warmup, "repeat": repeat,
+            "seed": seed, "copied": copied, "period": period, "results": results}
+
+def case_key(result):
+    return result["engine"], result["corpus"], result["length"]
+
+def settings(report):
+    #what the matches depend on; reports written before copied and period were recorded used the defaults
+    return report["k"], report["spans"], report.get("copied", COPIED), report.get("period", PERIOD)
+
+def compare_reports(baseline, report, tolerance = 0.1):
+    """
+    Find the cases that got slower.
+
+    Input:
+        - baseline, report: reports of run_suite, e.g. loaded from JSON files
+        - tolerance: fraction a median may grow before it counts as a regression
+    Output:
+        - list of (engine, corpus, length, old median ns, new median ns) for every case of both reports
+          whose median grew by more than the tolerance, or whose number of matches changed
+    """
+    if settings(baseline) != settings(report):
+        raise Exception("The reports were run with different k, spans, copied fraction or period!")
+    old = {case_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = old.get(case_key(result))
+        if before is None:
+            continue
+        if result["median_ns"] > before["median_ns"] * (1 + tolerance) or result["matches"] != before["matches"]:
+            regressions.append(case_key(result) + (before["median_ns"], result["median_ns"]))
+    return regressions
+
+def print_report(report):
+    """
+    Print the results of run_suite as a table.
+    """
+    print("engine     | corpus      | length  | median ms |    p95 ms | peak KB  | matches")
+    for result in report["results"]:
+        peak = "%8.1f" % (result["peak_bytes"] / 1024) if result["peak_bytes"] is not None else "       -"
+        print("%-10s | %-11s | %7d | %9.3f | %9.3f | %s | %d" % (result["engine"], result["corpus"], result["length"],
+                                                             result["median_ns"] / 1e6, result["p95_ns"] / 1e6,
+                                                             peak, result["matches"]))
+
+def print_tables():
+    #the comparisons recorded by the earlier changes
+    probe_benchmark()
+    memory_benchmark()
+    winnowing_benchmark()
+    parallel_benchmark()
+    vector_benchmark()
+    engine_benchmark()
+    multi_k_benchmark()
+    slicing_benchmark()
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Benchmark the matchers of plagiarism_detector.")
+    parser.add_argument("--engines", nargs="+", choices=list(SUITE_ENGINES), help="engines to time, by default all")
+    parser.add_argument("--corpora", nargs="+", choices=list(CORPORA), help="corpora to time on, by default all")
+    parser.add_argument("--lengths", nargs="+", type=int, default=[1000, 10000], help="lengths of x and y")
+    parser.add_argument("-k", type=int, default=8, help="length of substring")
+    parser.add_argument("--spans", action="store_true", help="coalesce the matches into spans")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs of every case")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs of every case")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpora")
+    parser.add_argument("--copied", type=float, default=COPIED, help="fraction of y copied from x in the plagiarized corpus")
+    parser.add_argument("--period", type=int, default=PERIOD, help="length of the repeated block in the repetitive corpus")
+    parser.add_argument("--output", help="write the report as JSON to this file, - for stdout")
+    parser.add_argument("--compare", help="JSON report to compare with; exits with status 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="slowdown allowed by --compare")
+    parser.add_argument("--tables", action="store_true", help="print the comparison tables instead")
+    args = parser.parse_args(argv)
+
+    if args.tables:
+        print_tables()
+        return 0
+
+    report = run_suite(args.engines, args.corpora, args.lengths, args.k, args.spans,
+                       args.warmup, args.repeat, not args.no_memory, args.seed, args.copied, args.period)
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    else:
+        print_report(report)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_reports(json.load(f), report, args.tolerance)
+        for engine, corpus, length, before, after in regressions:
+            print("regression: %s on %s, length %d: %.3f ms -> %.3f ms" % (engine, corpus, length, before / 1e6, after / 1e6),
+                  file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
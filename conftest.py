@@ -0,0 +1 @@
+#pytest puts the directory of this file on sys.path, so the tests import plagiarism_detector from the checkout
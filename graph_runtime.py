@@ -3,408 +3,13 @@
 
 # ## Plagirism Detector
 
+# - Times rh_get_match and regular_get_match on growing prefixes of two book chapters and plots the runtimes.
+# - The runtimes are medians of repeated runs, see benchmark.measure; `python benchmark.py` compares every engine.
+# - Nothing runs on import: the sweep and the plots are in main, and NumPy and matplotlib are only imported there.
 
-import math
-class HashTableNode:
-    '''
-    This hash table node stores the key and value pairs.
-    
-    Innput:
-        - key: the hash number of substring
-        - value: the substring
-        - index: start index in the original string
-    '''
-    def __init__(self, key, value,index,nextNode = None):
-        self.key = key
-        self.value = value
-        self.indexes = []
-        self.indexes.append(index)
-        #Q2
-        self.next = nextNode
-    
-class HashTable:
-    '''
-    This hash table uses open addressing to avoid collision. Each slot in the hashtable will only hold 1 element.
-    Double Hashing is used to probe the hashtable.
-    Source: Ha Nguyen and Quang Tran, “All you need to know about hashing (to build a plagiarism detector)”
-    '''
-    def __init__(self, m):
-        #initialize the table
-        self.capacity = m
-        self.hash_table = [None for _ in range(m)]
 
-    def double_hashing(self, key, i):
-        #since our i keeps increasing by 1
-        #we keep searching the next slot until we find an empty slot
-        return (self.hash_function_1(key) + i * self.hash_function_2(key)) % self.capacity
-
-    def hash_function_1(self, k):
-        return k % self.capacity
-    def hash_function_2(self, k):
-        return 1 + k % (self.capacity - 1)
-    
-    def open_addressing_insert(self, key, value, index): 
-        i=0
-        while i < self.capacity:
-            j = self.double_hashing(key, i)
-            #if we find an empty slot
-            if self.hash_table[j] is None:
-                #we insert the key-value pair into the hash table
-                self.hash_table[j] = HashTableNode(key, value, index)
-                return
-            #if already registared, record it in the index list 
-            if self.hash_table[j].value == value:
-                self.hash_table[j].indexes.append(index)
-                return
-            #else we increase i and continue probing
-            i += 1
-        raise Exception("All slots in hash table is filled!")
-        
-    def open_addressing_search(self, key, value): 
-        i=0
-        while i < self.capacity:
-          #we go through all slots
-            j = self.double_hashing(key, i)
-            if self.hash_table[j] is None:
-                #until we find an empty one, which means the value doesn't exist
-                return False
-            if self.hash_table[j].key == key and value == self.hash_table[j].value:
-                #or we find the value itself          
-                return self.hash_table[j].indexes
-            i += 1
-        return False
-    
-    #Q2
-    def djb2_hash_function(self, text):
-        """
-        Implementation of djb2 hash algorithm that
-        is popular because of it's magic constants.
-        """
-        hash = 5381
-        for char in text:
-            hash = ((hash << 5) + hash) + ord(char)
-        return hash & 0xFFFFFFFF
-    
-    def chained_hash_insert(self, value, index):
-        """
-        insert nodes into chained hashtable.
-
-        Input:
-            - value: the substring's text
-            - index: the substring's start index on th original string
-        """
-        #calculate hash key
-        hashed_key = self.djb2_hash_function(value)
-        #get table index to insert to
-        hIndex = hashed_key % self.capacity
-        
-        #create the node to store our key and value
-        node = HashTableNode(hashed_key, value, index)
-        
-        #if a node already exist
-        if self.hash_table[hIndex] is not None:
-            #go down the list to add node at the end
-            cur = self.hash_table[hIndex]
-            while cur is not None:     
-                if cur.value == value:
-                    #if there is duplicates, register
-                    cur.indexes.append(index)
-                    return
-                if cur.next is None:
-                    #if end of chain is reached, append
-                    cur.next = node
-                    return
-                cur = cur.next
-     
-        #if the spot is empty
-        self.hash_table[hIndex] = node
-        
-    def chained_hash_search(self, value):
-        #find the key after hashing
-        hashed_key = self.djb2_hash_function(value)
-        #get table index to look for
-        hIndex = hashed_key % self.capacity
-        
-        #start traversing from this node
-        cur = self.hash_table[hIndex]
-        #traversing the list to find the value
-        while cur is not None:
-            if cur.value == value:
-                return cur.indexes
-            cur = cur.next
-        return False
-
-def process_string(x,y):
-    """
-    get rid of the blank space in string x and y and lowercase all letters
-    
-    Input:
-        - x, y: strings
-    Output: 
-        - x1, y1: processed string with no blank space and all letters lowercased.
-    """
-    #check empty string
-    if x == None:
-        raise Exception("String X cannot be empty!")
-    
-    #x1, y1 will hold the processed strings
-    x1 = ""
-    y1 = ""
-    
-    x1 = x.replace(" ", "")
-    y1 = y.replace(" ", "")
-            
-    #lowercase the letters
-    x1 = x1.lower()
-    y1 = y1.lower()
-    
-    return x1, y1
-
-def str_to_int(sub):
-    """
-    This function will convert a substring into integer value.
-    
-    Input:
-        - sub: strings
-    Output:
-        - num: the integer that substring is converted to
-    """
-    num = 0
-    base = 7
-    k = len(sub)
-    
-    #loop through each character
-    for i in range(k):
-        #the exponent
-        exp = k-1-i
-        #repeatly add 
-        num += ord(sub[i]) * base ** exp
-
-    return num
-
-def _hash(sub):
-    """
-    This function will produce hash value for each sub_string.
-    
-    Input:
-        - sub: sub string to be converted
-    Output:
-        - hash value
-    """    
-    #convert to interger
-    num = str_to_int(sub)
-    
-    #produce hash value
-    hashVal = num % 10
-    
-    return hashVal
-    
-def rolling_hashing(x,k):
-    """
-    This function will produce hash value for every k-length substring using rolling hashing technique
-    
-    Input:
-        - x: strings
-        - k: length of substring 
-    Output:
-        - a list of hash values of each substring
-    """
-    #list to store substrings
-    hashVal = []
-    
-    #number of substrings
-    numOfSub = len(x)-k+1
-    base = 7
-    
-    #calculate the hash value of first substring
-    sub1 = x[0:k]
-    sub1Hash = _hash(sub1)
-    hashVal.append(sub1Hash)
-    
-    #start the rolling hashing from kth character
-    tempSub = sub1
-    tempHash = sub1Hash
-    for char in x[k:]:
-        #append one character at the end and calculate the hash value
-        tempHash = (tempHash * base + str_to_int(char)) % 10
-        #remove one character from the front and calculate the current hash value
-        currentHash = (tempHash - str_to_int(tempSub[0])*(base**k%10))% 10
-        hashVal.append(currentHash)
-        #update tempHash and tempSub
-        tempSub = tempSub[1:] + char
-        tempHash = currentHash
-    
-    return hashVal 
-
-def rolling_table_size(keyNum):
-    """
-    Finds the appropriate table size for a given length of strings. The table size should be around 1.3 times
-    the number of keys in the table and it should be a prime number.
-    
-    Input:
-        - l: length of string
-    Output:
-        - q: table size
-    """
-    #minimum length
-    minL = int(keyNum * 1.3)
-    
-    #return minimum length if it's smaller than 3
-    if minL <= 3:
-        return minL
-
-    #find the next prime number bigger than minimum length
-    q = minL
-    while True:
-        for i in range(2,q//2):
-            #if not prime number
-            if q % i == 0:
-                q += 1
-                continue
-        return q
-
-def rh_get_match(x, y, k):
-    """
-    Finds all common length-k substrings of x and y
-    using rolling hashing on strings.
-    Input:
-        - x, y: strings
-        - k: int, length of substring
-    Output:
-        - A list of tuples (i, j) where x[i:i+k] = y[j:j+k]
-    """
-    #process strings
-    x, y = process_string(x,y)
-    
-    #calculate hash table length
-    keyNum = len(x) - k + 1
-    size = rolling_table_size(keyNum)
-    
-    #create hash table
-    hTable1 = HashTable(size)
-    
-    #hash every substring
-    hashVal = rolling_hashing(x,k)
-    
-    #append substring in the table
-    for i in range(len(hashVal)):
-        hTable1.open_addressing_insert(hashVal[i], x[i:i+k], i)
-
-    #duplicate list
-    dup = []
-    
-    #search duplicate substring from y
-    for j in range(len(y)-k+1):
-        currentSub = y[j:j+k]
-        #if duplicate sub_string is found, search will return the duplicate substrings index list
-        indexes = hTable1.open_addressing_search(_hash(currentSub), currentSub)
-        if indexes:
-            for i in indexes:
-                dup.append((i,j))      
-    return dup
-
-
-#test cases
-
-#test duplicates handling
-assert(rh_get_match("Today is Monday", "day", 3)) == [(2, 0), (10, 0)]
-
-#test blank space, capitlized letters, and special characters
-assert(rh_get_match("Ha HA hA h.Apple ", "ha", 2)) == [(0,0), (2, 0), (4, 0)]
-
-#test real-life plagism examples(Direct Plagiarism, 2021)
-text = "Normal science, the activity in which most scientists inevitably spend almost all their time,         is predicated on the assumption that the scientific community knows what the world is like."
-assert(rh_get_match(text, text, 10)) == [(i,i) for i in range(148)]
- 
-
-def chained_table_size(strL):
-    """
-    Finds the appropriate table size for a given length of strings for the djb2 function. 
-    The table size is bigger than the string length for more evenly distribution of space(less colluisions) 
-    and should be a power of 2 for eaiser bitsize operations
-    
-    Input:
-        - strL: length of string
-    Output:
-        - q: table size
-    """  
-    #return 2 if it's smaller string length
-    if strL <= 2:
-        return strL
-
-    #find the next power of 2 bigger than string length
-    q = strL
-    while True:
-        #if log2(q) is a integer
-        if math.ceil(math.log(q, 2)) == math.floor(math.log(q, 2)):
-            return q
-        q += 1
-    
-def regular_get_match(x, y, k):
-    '''
-    Finds all common length-k substrings of x and y
-    NOT using rolling hashing on both strings.
-    
-    Input:
-        - x, y: strings
-        - k: int, length of substring
-    Output:
-        - A list of tuples (i, j)
-          where x[i:i+k] = y[j:j+k]
-    '''
-    #process strings
-    x, y = process_string(x,y)
-    
-    #calculate hash table length
-    size = chained_table_size(len(x))
-    
-    #create hash table
-    hTable2 = HashTable(size)
-    
-    #insert all length-k substrings of x
-    for i in range(len(x)-k+1):
-        hTable2.chained_hash_insert(x[i:i+k],i)
-        
-    #duplicate list
-    dup = []
-    
-    #the print_table function has been commented and its output for text case 1 is shown below.
-    #UNCOMMENT THIS if you want to print contents in table
-    #print_table(hTable2)
-        
-    #search all length-k substrings of y
-    for j in range(len(y)-k+1):
-        xIndex = hTable2.chained_hash_search(y[j:j+k])
-        #if duplicates found
-        if xIndex:
-            for i in xIndex:
-                dup.append((i,j))
-    return dup
-
-
-def print_table(table):
-    '''
-    Print out the hash table. Optional function. UNCOMMENT in regular_get_string
-    
-    Input:
-        - table: hash table with sub-strings inserted
-    '''
-    index = 0
-    for curNode in table.hash_table:
-        #if node exist
-        if curNode is not None:
-            if curNode.next is None:
-                #print information of node
-                print("index:",index, "| text =",curNode.value, "| index in original string = ",
-                      curNode.indexes)
-            while curNode.next is not None:
-                print("index:",index, "| text =",curNode.value, "| index in original string = ",
-                  curNode.indexes, "| next node = ", curNode.next.value)
-                curNode = curNode.next
-        #visit next indx
-        index += 1
-    
-regular_get_match("Today is Monday", "day", 3)
+from benchmark import measure
+from plagiarism_detector import regular_get_match, rh_get_match
 
 
 #input texts
@@ -414,10 +19,7 @@ text3 = "The Road to Extinction The drought had lasted now for ten million years
 text4 = "Silent Spring 1 The Madness Years China, 1967 The Red Union had been attacking the headquarters of the April Twenty-eighth Brigade for two days. Their red flags fluttered restlessly around the brigade building like flames yearning for firewood.The Red Union commander was anxious, though not because of the defenders he faced. The more than two hundred Red Guards of the April Twenty-eighth Brigade were mere greenhorns compared with the veteran Red Guards of the Red Union, which was formed at the start of the Great Proletarian Cultural Revolution in early 1966. The Red Union had been tempered by the tumultuous experience of revolutionary tours around the country and seeing Chairman Mao in the great rallies in Tiananmen Square. But the commander was afraid of the dozen or so iron stoves inside the building, filled with explosives and connected to each other by electric detonators. He couldn’t see them, but he could feel their presence like iron sensing the pull of a nearby magnet. If a defender flipped the switch, revolutionaries and counter-revolutionaries alike would all die in one giant ball of fire.And the young Red Guards of the April Twenty-eighth Brigade were indeed capable of such madness. Compared with the weathered men and women of the first generation of Red Guards, the new rebels were a pack of wolves on hot coals, crazier than crazy.The slender figure of a beautiful young girl emerged at the top of the building, waving the giant red banner of the April Twenty-eighth Brigade. Her appearance was greeted immediately by a cacophony of gunshots. The weapons attacking her were a diverse mix: antiques such as American carbines, Czech-style machine guns, Japanese Type-38 rifles; newer weapons such as standard-issue People’s Liberation Army rifles and submachine guns, stolen from the PLA after the publication of the “August Editorial”*; and even a few Chinese dadao swords and spears. Together, they formed a condensed version of modern history.* Translator’s Note: This refers to the August 1967 editorial in Red Flag magazine (an important source of propaganda during the Cultural Revolution), which advocated for “pulling out the handful [of counter-revolutionaries] within the army.” Many read the editorial as tacitly encouraging Red Guards to attack military armories and seize weapons from the PLA, further inflaming the local civil wars waged by Red Guard factions.Numerous members of the April Twenty-eighth Brigade had engaged in similar displays before. They’d stand on top of the building, wave a flag, shout slogans through megaphones, and scatter flyers at the attackers below. Every time, the courageous man or woman had been able to retreat safely from the hailstorm of bullets and earn glory for their valor.The new girl clearly thought she’d be just as lucky. She waved the battle banner as though brandishing her burning youth, trusting that the enemy would be burnt to ashes in the revolutionary flames, imagining that an ideal world would be born tomorrow from the ardor and zeal coursing through her blood.… She was intoxicated by her brilliant, crimson dream until a bullet pierced her chest.Her fifteen-year-old body was so soft that the bullet hardly slowed down as it passed through it and whistled in the air behind her. The young Red Guard tumbled down along with her flag, her light form descending even more slowly than the piece of red fabric, like a little bird unwilling to leave the sky.The Red Union warriors shouted in joy. A few rushed to the foot of the building, tore away the battle banner of the April Twenty-eighth Brigade, and seized the slender, lifeless body. They raised their trophy overhead and flaunted it for a while before tossing it toward the top of the metal gate of the compound.Most of the gate’s metal bars, capped with sharp tips, had been pulled down at the beginning of the factional civil wars to be used as spears, but two still remained. As their sharp tips caught the girl, life seemed to return momentarily to her body.The Red Guards backed up some distance and began to use the impaled body for target practice. For her, the dense storm of bullets was now no different from a gentle rain, as she could no longer feel anything. From time to time, her vinelike arms jerked across her body softly, as though she were flicking off drops of rain.And then half of her young head was blown away, and only a single, beautiful eye remained to stare at the blue sky of 1967. There was no pain in that gaze, only solidified devotion and yearning.And yet, compared to some others, she was fortunate. At least she died in the throes of passionately sacrificing herself for an ideal.Battles like this one raged across Beijing like a multitude of CPUs working in parallel, their combined output, the Cultural Revolution. A flood of madness drowned the city and seeped into every nook and cranny.At the edge of the city, on the exercise grounds of Tsinghua University, a mass “struggle session” attended by thousands had been going on for nearly two hours. This was a public rally intended to humiliate and break down the enemies of the revolution through verbal and physical abuse until they confessed to their crimes before the crowd.As the revolutionaries had splintered into numerous factions, opposing forces everywhere engaged in complex maneuvers and contests. Within the university, intense conflicts erupted between the Red Guards, the Cultural Revolution Working Group, the Workers’ Propaganda Team, and the Military Propaganda Team. And each faction divided into new rebel groups from time to time, each based on different backgrounds and agendas, leading to even more ruthless fighting.But for this mass struggle session, the victims were the reactionary bourgeois academic authorities. These were the enemies of every faction, and they had no choice but to endure cruel attacks from every side.Compared to other “Monsters and Demons,”* reactionary academic authorities were special: during the earliest struggle sessions, they had been both arrogant and stubborn. That was also the stage in which they had died in the largest numbers. Over a period of forty days, in Beijing alone, more than seventeen hundred victims of struggle sessions were beaten to death. Many others picked an easier path to avoid the madness: Lao She, Wu Han, Jian Bozan, Fu Lei, Zhao Jiuzhang, Yi Qun, Wen Jie, Hai Mo, and other once-respected intellectuals had all chosen to end their lives.*** Translator’s Note: Originally a term from Buddhism, “Monsters and Demons” was used during the Cultural Revolution to refer to all the enemies of the revolution.** Translator’s Note: These were some of the most famous intellectuals who committed suicide during the Cultural Revolution. Lao She: writer; Wu Han: historian; Jian Bozan: historian; Fu Lei: translator and critic; Zhao Jiuzhang: meteorologist and geophysicist; Yi Qun: writer; Wen Jie: poet; Hai Mo: screenwriter and novelist.Those who survived that initial period gradually became numb as the ruthless struggle sessions continued. The protective mental shell helped them avoid total breakdown. They often seemed to be half asleep during the sessions and would only startle awake when someone screamed in their faces to make them mechanically recite their confessions, already repeated countless times.Then, some of them entered a third stage. The constant, unceasing struggle sessions injected vivid political images into their consciousness like mercury, until their minds, erected upon knowledge and rationality, collapsed under the assault. They began to really believe that they were guilty, to see how they had harmed the great cause of the revolution. They cried, and their repentance was far deeper and more sincere than that of those Monsters and Demons who were not intellectuals.For the Red Guards, heaping abuse upon victims in those two latter mental stages was utterly boring. Only those Monsters and Demons who were still in the initial stage could give their overstimulated brains the thrill they craved, like the red cape of the matador. But such desirable victims had grown scarce. In Tsinghua there was probably only one left. Because he was so rare, he was reserved for the very end of the struggle session.Ye Zhetai had survived the Cultural Revolution so far, but he remained in the first mental stage. He refused to repent, to kill himself, or to become numb. When this physics professor walked onto the stage in front of the crowd, his expression clearly said: Let the cross I bear be even heavier.The Red Guards did indeed have him carry a burden, but it wasn’t a cross. Other victims wore tall hats made from bamboo frames, but his was welded from thick steel bars. And the plaque he wore around his neck wasn’t wooden, like the others, but an iron door taken from a laboratory oven. His name was written on the door in striking black characters, and two red diagonals were drawn across them in a large X.Twice the number of Red Guards used for other victims escorted Ye onto the stage: two men and four women. The two young men strode with confidence and purpose, the very image of mature Bolshevik youths. They were both fourth-year students* majoring in theoretical physics, and Ye was their professor. The women, really girls, were much younger, second-year students from the junior high school attached to the university.** Dressed in military uniforms and equipped with bandoliers, they exuded youthful vigor and surrounded Ye Zhetai like four green flames. * Translator’s Note: Chinese colleges (and Tsinghua in particular) have a complicated history of shifting between four-year, five-year, and three-year systems up to the time of the Cultural Revolution. I’ve therefore avoided using American terms such as “freshman,” “sophomore,” “junior,” and “senior” to translate the classes of these students."
 
 
-import time
-import random
-
-def compute_runtime(x,y,k):
+def compute_runtime(x,y,k, repeat = 5):
     """,;
     Compute and return runtime for open-addressing hash table and chaining hash table. 
     This function will store the substrings of string x into the hash table and search 
@@ -427,70 +29,67 @@ def compute_runtime(x,y,k):
         - x: string, whose substrings to be inserted in the hash tables
         - y: string, whose substrings will be searched for match in the hash tables
         - k: the length of substrings to perform check
+        - repeat: number of timed runs, see benchmark.measure
 
     Output:
-        - OA_time: float, runtime of open-addressing hash table of different length of x and y
-        - C_time: float, runtime of chaining hash table of different length of x and y
+        - OA_time: float, median runtime in seconds of open-addressing hash table of different length of x and y
+        - C_time: float, median runtime in seconds of chaining hash table of different length of x and y
     """
-
-    #variabes that store runtime of each sorting algorithm
-    OA_time = 0
-    C_time = 0
-     
-    #time the first approach
-    start1 = time.time()
-    rh_get_match(x,y,k)
-    end1 = time.time()
-    OA_time += end1 - start1
-
-    #time the second approach
-    start2 = time.time()
-    regular_get_match(x,y,k)
-    end2 = time.time()
-    C_time += end2 - start2
+    #one run timed with time.time() was mostly noise, so take the median of warmed-up runs
+    OA_time = measure(rh_get_match, x, y, k, repeat = repeat, memory = False)["median_ns"] / 1e9
+    C_time = measure(regular_get_match, x, y, k, repeat = repeat, memory = False)["median_ns"] / 1e9
     
     return OA_time,C_time
 
-#variables to time took by each input size
-OA_time, C_time = 0,0
-#lists to store time of different input size
-OA_times = []
-C_times = []
-strLength = []
-
-#record the time taken for two approaches for different string length
-for l in range(100,len(text3), 100):
-    #slice the texts 
-    OA_time, C_time = compute_runtime(text3[:l], text4[:l], 8)
-    #add to list
-    OA_times.append(OA_time)
-    C_times.append(C_time)
-    #record length
-    strLength.append(l)
-
-#plotting graph
-import numpy as np
-import matplotlib.pyplot as plt
-
-plt.plot(strLength,OA_times,label = "Open Addressing Table")
-plt.plot(strLength,C_times,label = "Chaining Table")
-
-plt.ylabel("Time")
-plt.xlabel("Input Length")
-plt.title("Runtime Taken by Open Addressing Table and Chaining Table")
-plt.legend()
-
-
-#plot logN graph
-x = np.array(strLength[1:])
-nlogn = np.multiply(np.log(x)/np.log(3),x)
-plt.plot(x, nlogn, "--", label = "n*log_3(n)")
-
-plt.plot(strLength,OA_times,label = "Open Addressing Table")
-plt.plot(strLength,C_times,label = "Chaining Table")
-
-plt.ylabel("Time")
-plt.xlabel("Input Length")
-plt.title("Runtime Taken by Open Addressing Table and Chaining Table")
-plt.legend()
-
+def main():
+    """
+    Record the runtime of both tables for every 100 characters of text3 and text4, and plot it.
+    """
+    #plotting needs NumPy and matplotlib, which nothing else imports
+    import numpy as np
+    import matplotlib.pyplot as plt
+
+    #variables to time took by each input size
+    OA_time, C_time = 0,0
+    #lists to store time of different input size
+    OA_times = []
+    C_times = []
+    strLength = []
+
+    #record the time taken for two approaches for different string length
+    for l in range(100,len(text3), 100):
+        #slice the texts 
+        OA_time, C_time = compute_runtime(text3[:l], text4[:l], 8)
+        #add to list
+        OA_times.append(OA_time)
+        C_times.append(C_time)
+        #record length
+        strLength.append(l)
+
+    #plotting graph
+    plt.plot(strLength,OA_times,label = "Open Addressing Table")
+    plt.plot(strLength,C_times,label = "Chaining Table")
+
+    plt.ylabel("Time")
+    plt.xlabel("Input Length")
+    plt.title("Runtime Taken by Open Addressing Table and Chaining Table")
+    plt.legend()
+    plt.show()
+
+    #plot logN graph
+    x = np.array(strLength[1:])
+    nlogn = np.multiply(np.log(x)/np.log(3),x)
+    plt.plot(x, nlogn, "--", label = "n*log_3(n)")
+
+    plt.plot(strLength,OA_times,label = "Open Addressing Table")
+    plt.plot(strLength,C_times,label = "Chaining Table")
+
+    plt.ylabel("Time")
+    plt.xlabel("Input Length")
+    plt.title("Runtime Taken by Open Addressing Table and Chaining Table")
+    plt.legend()
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
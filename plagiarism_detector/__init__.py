@@ -0,0 +1,21 @@
+# ## Plagirism Detector
+
+# - The matchers, hash tables and hashing engines of the notebooks, importable without running anything:
+#   importing the package only defines functions and classes.
+# - NumPy is only imported when a NumPy matcher is called, see vectorized.load_numpy, and matplotlib only by
+#   the plotting in graph_runtime.py.
+
+
+from .batch_match import all_pairs_get_match
+from .chaining import chained_table_size, regular_get_match
+from .corpus_index import CorpusIndex
+from .kgram_index import KGramIndex
+from .matchers import (ENGINES, build_index, choose_engine, compact_get_match, get_match, index_get_match,
+                       merge_get_match, multi_get_match, sam_get_match, vector_get_match)
+from .normalize import DEFAULT_NORMALIZER, DEFAULT_RULES, STRICT_RULES, Normalizer, normalize, to_original
+from .open_addressing import HashTable, HashTableNode, process_string, rh_get_match, rolling_table_size
+from .parallel import parallel_build_index, parallel_get_match, parallel_query
+from .rolling_hash import fingerprint, fingerprint_stream, rolling_fingerprints, winnow
+from .stats import MatchStats
+from .streaming import file_chunks, stream_get_match
+from .suffix_automaton import SuffixAutomaton
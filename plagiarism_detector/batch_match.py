@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## All-Pairs Plagiarism Detection
+
+# - Comparing every submission of a class with every other one through rh_get_match rebuilds a table for x
+#   on every call: 124,750 tables for 500 submissions.
+# - Here every document is fingerprinted once into a shared inverted index, with postings packed like in
+#   corpus_index.py. Two documents share a k-gram only if their postings sit in the same group, so joining
+#   the postings of each group gives every matching pair at once.
+# - Each pair gets the Jaccard similarity of the sets of distinct k-grams of the two documents.
+
+
+from array import array
+
+from .corpus_index import OFFSET_BITS, OFFSET_MASK
+from .kgram_index import merge_postings
+from .match_spans import MatchCollector
+from .normalize import DEFAULT_NORMALIZER
+from .rolling_hash import fingerprint_stream
+
+
+def all_pairs_get_match(documents, k, spans = True, w = None, normalizer = None, maxDocuments = None):
+    """
+    Finds the common length-k substrings of every pair of documents.
+
+    Input:
+        - documents: dictionary from document id to text, or list of (id, text) pairs
+        - k: int, length of substring
+        - spans: if True, coalesce overlapping matches into maximal spans
+        - w: if given, winnowing window, see rh_get_match
+        - normalizer: Normalizer used to process the documents, see process_string
+        - maxDocuments: if given, ignore the k-grams found in more than this many documents,
+          such as boilerplate from an assignment prompt
+    Output:
+        - list of tuples (idA, idB, similarity, matches) for every pair sharing at least one k-gram,
+          most similar first, where matches are in the format of rh_get_match with x = document idA
+          and y = document idB
+    """
+    if normalizer is None:
+        normalizer = DEFAULT_NORMALIZER
+    if isinstance(documents, dict):
+        documents = documents.items()
+
+    #fingerprint every document once
+    docIds = []
+    texts = []
+    keys = array('q')
+    postings = array('q')
+    for docId, text in documents:
+        number = len(docIds)
+        docIds.append(docId)
+        processed = normalizer.normalize(text)
+        texts.append(processed)
+        base = number << OFFSET_BITS
+        for i, key in fingerprint_stream(processed, k, w):
+            keys.append(key)
+            postings.append(base | i)
+
+    #one inverted index for the whole set
+    fingerprints, offsets, postings = merge_postings(array('q'), array('q', [0]), array('q'), keys, postings)
+
+    #number of distinct k-grams of each document
+    distinct = [0] * len(docIds)
+    #(numberA, numberB) -> matches (i, j) and number of shared distinct k-grams
+    pairMatches = {}
+    pairShared = {}
+    for g in range(len(fingerprints)):
+        start = offsets[g]
+        end = offsets[g+1]
+        first = postings[start] >> OFFSET_BITS
+        if postings[end-1] >> OFFSET_BITS == first:
+            #postings are in document order, so the whole group is in one document and nothing is joined;
+            #it counts as one k-gram, unless a fingerprint collision put two substrings of the document here
+            distinct[first] += 1
+            continue
+        #split the group by substring, in case two substrings share a fingerprint;
+        #each substring is sliced once and the other postings are compared with it in place
+        groups = []
+        for posting in postings[start:end]:
+            number = posting >> OFFSET_BITS
+            i = posting & OFFSET_MASK
+            text = texts[number]
+            for sub, occurrences in groups:
+                if text.startswith(sub, i):
+                    occurrences.append((number, i))
+                    break
+            else:
+                groups.append((text[i:i+k], [(number, i)]))
+
+        for _, occurrences in groups:
+            numbers = sorted(set(number for number, _ in occurrences))
+            for number in numbers:
+                distinct[number] += 1
+            if len(numbers) < 2 or (maxDocuments is not None and len(numbers) > maxDocuments):
+                continue
+            #join: every occurrence with every occurrence of a later document
+            for a in range(len(numbers)):
+                for b in range(a + 1, len(numbers)):
+                    pair = (numbers[a], numbers[b])
+                    pairShared[pair] = pairShared.get(pair, 0) + 1
+            for numberA, i in occurrences:
+                for numberB, j in occurrences:
+                    if numberA < numberB:
+                        pairMatches.setdefault((numberA, numberB), []).append((i, j))
+
+    results = []
+    for pair in sorted(pairMatches):
+        matches = pairMatches[pair]
+        numberA, numberB = pair
+        #the collector expects the windows of y in increasing order
+        matches.sort(key=lambda match: (match[1], match[0]))
+        dup = MatchCollector(k, spans)
+        n = 0
+        while n < len(matches):
+            j = matches[n][1]
+            indexes = []
+            while n < len(matches) and matches[n][1] == j:
+                indexes.append(matches[n][0])
+                n += 1
+            dup.add(j, indexes)
+
+        shared = pairShared[pair]
+        similarity = shared / (distinct[numberA] + distinct[numberB] - shared)
+        results.append((docIds[numberA], docIds[numberB], similarity, dup.result()))
+
+    #most similar pairs first, then in the order the documents were given
+    results.sort(key=lambda result: -result[2])
+    return results
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## djb2 Hashing & Chaining
+
+# - I choose the chaining method to avoid colluision and djb2 hash function.
+# - The djb2 hash function is chosen because it is known for distributing keys more evenly than other hash function("Hash Functions",2021).
+# - djb2 is a polynomial hash with base 33, so regular_get_match rolls it over x and y with rolling_hash.iter_djb2: every window gets the same hash as djb2_hash_function, in O(1) instead of O(k).
+
+
+from .match_spans import MatchCollector
+from .open_addressing import HashTableNode, process_string
+from .rolling_hash import iter_djb2
+from .stats import phase
+
+
+class HashTable:
+    '''
+    This hash table uses open addressing to avoid collision. Each slot in the hashtable will only hold 1 element.
+    Double Hashing is used to probe the hashtable.
+    Source: Ha Nguyen and Quang Tran, “All you need to know about hashing (to build a plagiarism detector)”
+    '''
+    def __init__(self, m, stats = None, text = None, k = None):
+        #initialize the table
+        self.capacity = m
+        self.hash_table = [None for _ in range(m)]
+        #MatchStats that records the length of every chain walked, or None
+        self.stats = stats
+        #string whose k-grams chained_position_insert stores by start index only
+        self.text = text
+        self.k = k
+
+    def double_hashing(self, key, i):
+        #since our i keeps increasing by 1
+        #we keep searching the next slot until we find an empty slot
+        return (self.hash_function_1(key) + i * self.hash_function_2(key)) % self.capacity
+
+    def hash_function_1(self, k):
+        return k % self.capacity
+    def hash_function_2(self, k):
+        return 1 + k % (self.capacity - 1)
+  
+    def djb2_hash_function(self, text):
+        """
+        Implementation of djb2 hash algorithm that
+        is popular because of it's magic constants.
+        """
+        hash = 5381
+        for char in text:
+            hash = ((hash << 5) + hash) + ord(char)
+        return hash & 0xFFFFFFFF
+    
+    def chained_hash_insert(self, value, index):
+        """
+        insert nodes into chained hashtable.
+
+        Input:
+            - value: the substring's text
+            - index: the substring's start index on th original string
+        """
+        #calculate hash key
+        hashed_key = self.djb2_hash_function(value)
+        #get table index to insert to
+        hIndex = hashed_key % self.capacity
+        
+        #create the node to store our key and value
+        node = HashTableNode(hashed_key, value, index)
+        if self.stats is not None:
+            self.stats.insert_chains[self._walk(hIndex, hashed_key, lambda cur: cur.value == value)[0]] += 1
+        
+        #if a node already exist
+        if self.hash_table[hIndex] is not None:
+            #go down the list to add node at the end
+            cur = self.hash_table[hIndex]
+            while cur is not None:     
+                #comparing the hashes first skips most substring comparisons
+                if cur.key == hashed_key and cur.value == value:
+                    #if there is duplicates, register
+                    cur.indexes.append(index)
+                    return
+                if cur.next is None:
+                    #if end of chain is reached, append
+                    cur.next = node
+                    return
+                cur = cur.next
+     
+        #if the spot is empty
+        self.hash_table[hIndex] = node
+        
+    def chained_hash_search(self, value):
+        #find the key after hashing
+        hashed_key = self.djb2_hash_function(value)
+        #get table index to look for
+        hIndex = hashed_key % self.capacity
+        
+        if self.stats is not None:
+            self._record_search(hIndex, hashed_key, lambda cur: cur.value == value)
+        
+        #start traversing from this node
+        cur = self.hash_table[hIndex]
+        #traversing the list to find the value
+        while cur is not None:
+            if cur.key == hashed_key and cur.value == value:
+                return cur.indexes
+            cur = cur.next
+        return False
+
+    def chained_position_insert(self, hashed_key, index):
+        """
+        Same as chained_hash_insert(text[index:index+k], index) for the text the table was made with,
+        without storing the substring: the node keeps its start indexes only.
+
+        Input:
+            - hashed_key: djb2 hash of text[index:index+k]
+            - index: start index of the substring
+        """
+        text = self.text
+        hIndex = hashed_key % self.capacity
+        if self.stats is not None:
+            same = lambda cur: text.startswith(text[index:index+self.k], cur.indexes[0])
+            self.stats.insert_chains[self._walk(hIndex, hashed_key, same)[0]] += 1
+        
+        cur = self.hash_table[hIndex]
+        if cur is None:
+            self.hash_table[hIndex] = HashTableNode(hashed_key, None, index)
+            return
+        while True:
+            #the substring is only sliced when the hashes are equal
+            if cur.key == hashed_key and text.startswith(text[index:index+self.k], cur.indexes[0]):
+                cur.indexes.append(index)
+                return
+            if cur.next is None:
+                cur.next = HashTableNode(hashed_key, None, index)
+                return
+            cur = cur.next
+
+    def chained_position_search(self, hashed_key, y, start):
+        """
+        Same as chained_hash_search(y[start:start+k]) for a table filled by chained_position_insert.
+
+        Input:
+            - hashed_key: djb2 hash of y[start:start+k]
+            - y, start: the string searched and the start index of the window
+        Output:
+            - list of start indexes in text, or False if the window doesn't occur
+        """
+        hIndex = hashed_key % self.capacity
+        if self.stats is not None:
+            self._record_search(hIndex, hashed_key, lambda cur: self.text.startswith(y[start:start+self.k], cur.indexes[0]))
+        
+        cur = self.hash_table[hIndex]
+        while cur is not None:
+            #the window of y is only sliced for a node with the same hash
+            if cur.key == hashed_key and self.text.startswith(y[start:start+self.k], cur.indexes[0]):
+                return cur.indexes
+            cur = cur.next
+        return False
+
+    def _walk(self, hIndex, hashed_key, same):
+        #nodes an insert or search walks in chain hIndex, the substrings it compares, and whether it finds one;
+        #same(node) compares the substring of a node with the same hash.
+        #only called with stats, so the walks themselves count nothing
+        walked = 0
+        compared = 0
+        cur = self.hash_table[hIndex]
+        while cur is not None:
+            walked += 1
+            if cur.key == hashed_key:
+                compared += 1
+                if same(cur):
+                    return walked, compared, True
+            cur = cur.next
+        return walked, compared, False
+
+    def _record_search(self, hIndex, hashed_key, same):
+        walked, compared, found = self._walk(hIndex, hashed_key, same)
+        self.stats.search_chains[walked] += 1
+        self.stats.comparisons += compared
+        #a compared substring that is not the one searched has the same hash
+        self.stats.collisions += compared - found
+
+    def node_text(self, node):
+        #substring of a node, also for the nodes of chained_position_insert that only keep positions
+        if node.value is None and self.text is not None:
+            return self.text[node.indexes[0]:node.indexes[0]+self.k]
+        return node.value
+
+    def node_count(self):
+        #number of distinct substrings stored
+        count = 0
+        for cur in self.hash_table:
+            while cur is not None:
+                count += 1
+                cur = cur.next
+        return count
+
+
+def chained_table_size(strL):
+    """
+    Finds the appropriate table size for a given length of strings for the djb2 function. 
+    The table size is bigger than the string length for more evenly distribution of space(less colluisions) 
+    and should be a power of 2 for eaiser bitsize operations
+    
+    Input:
+        - strL: length of string
+    Output:
+        - q: table size
+    """  
+    #the smallest table has 1 slot
+    if strL <= 1:
+        return 1
+
+    #find the next power of 2 bigger than string length
+    #strL-1 has as many bits as the exponent we need
+    return 1 << (strL - 1).bit_length()
+    
+def regular_get_match(x, y, k, spans = False, original = False, normalizer = None, stats = None):
+    '''
+    Finds all common length-k substrings of x and y
+    NOT using rolling hashing on both strings.
+    
+    Input:
+        - x, y: strings
+        - k: int, length of substring
+        - spans: if True, coalesce overlapping matches into maximal spans
+        - original: if True, report the matches in positions of the original x and y instead of the processed ones
+        - normalizer: Normalizer used to process x and y, see process_string
+        - stats: if given, a MatchStats that records the chain lengths, collisions and phase timings, see stats.py
+    Output:
+        - A list of tuples (i, j)
+          where x[i:i+k] = y[j:j+k]
+        - or if spans is True, a list of tuples (i, j, length)
+          where x[i:i+length] = y[j:j+length]
+        - if original is True, spans become (i, j, x_length, y_length) counted in original characters
+    '''
+    #process strings
+    with phase(stats, "normalize"):
+        x, y, *offsets = process_string(x,y, original, normalizer)
+    
+    with phase(stats, "index"):
+        #calculate hash table length
+        size = chained_table_size(len(x))
+        
+        #create hash table, its nodes only keep the positions of the substrings in x
+        hTable2 = HashTable(size, stats = stats, text = x, k = k)
+        
+        #insert all length-k substrings of x, rolling djb2 instead of hashing every window from scratch
+        for i, hashed_key in iter_djb2(x, k):
+            hTable2.chained_position_insert(hashed_key, i)
+        
+    #duplicate list, coalesced into spans and translated to original positions as requested
+    dup = MatchCollector(k, spans, offsets)
+    
+    #the print_table function has been commented and its output for text case 1 is shown below.
+    #UNCOMMENT THIS if you want to print contents in table
+    #print_table(hTable2)
+        
+    with phase(stats, "query"):
+        #search all length-k substrings of y, rolling djb2 the same way as for x
+        for j, hashed_key in iter_djb2(y, k):
+            xIndex = hTable2.chained_position_search(hashed_key, y, j)
+            #if duplicates found
+            if xIndex:
+                dup.add(j, xIndex)
+
+    with phase(stats, "merge"):
+        result = dup.result()
+    if stats is not None:
+        stats.record_table(hTable2.node_count(), hTable2.capacity)
+    return result
+
+
+def print_table(table):
+    '''
+    Print out the hash table. Optional function. UNCOMMENT in regular_get_string
+    
+    Input:
+        - table: hash table with sub-strings inserted
+    '''
+    index = 0
+    for curNode in table.hash_table:
+        #if node exist
+        if curNode is not None:
+            if curNode.next is None:
+                #print information of node
+                print("index:",index, "| text =",table.node_text(curNode), "| index in original string = ",
+                      curNode.indexes)
+            while curNode.next is not None:
+                print("index:",index, "| text =",table.node_text(curNode), "| index in original string = ",
+                  curNode.indexes, "| next node = ", table.node_text(curNode.next))
+                curNode = curNode.next
+        #visit next indx
+        index += 1
+
+
+# "Hash Functions". (2021). York University CSE. Retrieved from http://www.cse.yorku.ca/~oz/hash.html
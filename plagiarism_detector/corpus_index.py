@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Reference Corpus Index
+
+# - The README suggests putting every reference document into one string x. Matches can then cross the
+#   boundary between two documents, and the returned index must be mapped back to a document by hand.
+# - CorpusIndex keeps the documents apart. The k-grams of each document are fingerprinted on their own, so
+#   no k-gram spans two documents, and each posting records which document it came from.
+# - A posting packs (document number, offset) into one 8-byte integer: document << 32 | offset.
+#   The postings use the same CSR layout as KGramIndex, see kgram_index.py.
+# - The index is kept as a list of immutable segments, like a log-structured merge tree:
+#     - new documents are fingerprinted into a small segment of their own, so adding costs O(document)
+#     - a segment is merged with the one before it once it grows to a similar size, so there are only
+#       O(log n) segments and every posting is merged O(log n) times
+#     - removing a document only marks its number as deleted (a tombstone); its postings are skipped by queries
+#       and dropped by the next merge or by compact, which can run in a background thread
+#     - while compact merges a snapshot of the segments, flushes only merge the segments that came after it,
+#       so the compacted segment can always replace the snapshot
+
+
+import threading
+from array import array
+
+from .kgram_index import find_postings, merge_postings
+from .match_spans import MatchCollector
+from .normalize import DEFAULT_NORMALIZER
+from .rolling_hash import fingerprint_stream
+
+
+#low 32 bits of a posting hold the offset in the document
+OFFSET_BITS = 32
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+
+
+class Segment:
+    '''
+    Immutable CSR arrays of the postings of some documents.
+    '''
+    def __init__(self, fingerprints, offsets, postings):
+        self.fingerprints = fingerprints
+        self.offsets = offsets
+        self.postings = postings
+
+    def __len__(self):
+        return len(self.postings)
+
+    def lookup(self, key):
+        #postings of key, empty if key is absent
+        start, end = find_postings(self.fingerprints, self.offsets, key)
+        return self.postings[start:end]
+
+    @classmethod
+    def merge(cls, segments, deleted):
+        """
+        Merge segments into one, dropping the postings of deleted documents.
+
+        Input:
+            - segments: list of Segment, oldest first
+            - deleted: set of deleted document numbers
+        Output:
+            - segment: Segment
+        """
+        keys = array('q')
+        postings = array('q')
+        for segment in segments:
+            for g in range(len(segment.fingerprints)):
+                key = segment.fingerprints[g]
+                for posting in segment.postings[segment.offsets[g]:segment.offsets[g+1]]:
+                    if posting >> OFFSET_BITS not in deleted:
+                        keys.append(key)
+                        postings.append(posting)
+        return cls(*merge_postings(array('q'), array('q', [0]), array('q'), keys, postings))
+
+
+class CorpusIndex:
+    '''
+    K-gram index of many reference documents, answering which documents a submission overlaps and where.
+    Documents can be added and removed at any time without rebuilding the index.
+    '''
+    def __init__(self, k, w = None, normalizer = None, mergeFactor = 2):
+        self.k = k
+        #winnowing window, see rh_get_match
+        self.w = w
+        self.normalizer = normalizer if normalizer is not None else DEFAULT_NORMALIZER
+        #a segment is merged into the previous one when the previous one is at most mergeFactor times bigger
+        self.mergeFactor = mergeFactor
+        #per document, by document number: id, processed text and offset map; None once removed
+        self.docIds = []
+        self.texts = []
+        self.sourceOffsets = []
+        self.docNumbers = {}
+        #numbers of removed documents whose postings may still be in a segment
+        self.deleted = set()
+        #segments, oldest first
+        self.segments = []
+        #postings not yet flushed into a segment
+        self._pending_keys = array('q')
+        self._pending_postings = array('q')
+        #held while the list of segments changes
+        self.lock = threading.Lock()
+        #held by a running compaction, and the number of leading segments it is merging
+        self.compactLock = threading.Lock()
+        self._frozen = 0
+
+    def __len__(self):
+        #number of documents
+        return len(self.docNumbers)
+
+    def __contains__(self, docId):
+        return docId in self.docNumbers
+
+    def add_document(self, docId, text):
+        """
+        Add a reference document. Its postings are flushed into a new segment on the next query.
+
+        Input:
+            - docId: any hashable id of the document
+            - text: the original text of the document
+        """
+        if docId in self.docNumbers:
+            raise Exception("Document %r is already in the index!" % (docId,))
+        processed, offsets = self.normalizer.normalize(text, offsets = True)
+        if len(processed) > OFFSET_MASK:
+            raise Exception("Document %r is too long to be indexed!" % (docId,))
+
+        number = len(self.docIds)
+        self.docNumbers[docId] = number
+        self.docIds.append(docId)
+        self.texts.append(processed)
+        self.sourceOffsets.append(offsets)
+
+        base = number << OFFSET_BITS
+        for i, key in fingerprint_stream(processed, self.k, self.w):
+            self._pending_keys.append(key)
+            self._pending_postings.append(base | i)
+
+    def remove_document(self, docId):
+        """
+        Remove a reference document. Its postings stay in the segments until they are merged or compacted,
+        but queries skip them from now on.
+
+        Input:
+            - docId: id given to add_document
+        """
+        if docId not in self.docNumbers:
+            raise Exception("Document %r is not in the index!" % (docId,))
+        number = self.docNumbers.pop(docId)
+        self.deleted.add(number)
+        self.texts[number] = None
+        self.sourceOffsets[number] = None
+
+    def build(self):
+        """
+        Flush the pending postings into a new segment, then merge segments of similar size.
+        """
+        if not self._pending_keys:
+            return
+        segment = Segment(*merge_postings(array('q'), array('q', [0]), array('q'),
+                                          self._pending_keys, self._pending_postings))
+        self._pending_keys = array('q')
+        self._pending_postings = array('q')
+
+        with self.lock:
+            segments = self.segments + [segment]
+            #like carrying in a binary counter, each merge doubles the size of the last segment
+            #segments being compacted are left alone
+            while len(segments) > self._frozen + 1 and len(segments[-2]) <= self.mergeFactor * len(segments[-1]):
+                merged = Segment.merge(segments[-2:], self.deleted)
+                segments = segments[:-2] + [merged]
+            self.segments = segments
+
+    def compact(self, background = False):
+        """
+        Merge every segment into one and forget the postings of removed documents.
+
+        Input:
+            - background: if True, merge in a daemon thread while queries keep using the old segments
+        Output:
+            - the started thread if background is True
+        """
+        self.build()
+        if background:
+            thread = threading.Thread(target=self._compact, daemon=True)
+            thread.start()
+            return thread
+        self._compact()
+
+    def _compact(self):
+        #one compaction at a time, so only one snapshot is frozen
+        with self.compactLock:
+            with self.lock:
+                snapshot = self.segments
+                deleted = set(self.deleted)
+                self._frozen = len(snapshot)
+            try:
+                if not snapshot:
+                    return
+                #the slow part runs without the lock
+                merged = Segment.merge(snapshot, deleted)
+                with self.lock:
+                    #segments flushed meanwhile were appended after the snapshot and are kept
+                    self.segments = [merged] + self.segments[len(snapshot):]
+            finally:
+                self._frozen = 0
+
+    def query(self, y, spans = True, original = False):
+        """
+        Find every reference document that shares length-k substrings with y, in one pass over y.
+
+        Input:
+            - y: string, the submission
+            - spans: if True, coalesce overlapping matches into maximal spans
+            - original: if True, report the matches in positions of the original texts
+        Output:
+            - dictionary from document id to its list of matches, in the format of rh_get_match,
+              where i is a position in that document; documents without matches are left out
+        """
+        self.build()
+        k = self.k
+        if original:
+            y, yOffsets = self.normalizer.normalize(y, offsets = True)
+        else:
+            y = self.normalizer.normalize(y)
+        segments = self.segments
+        texts = self.texts
+
+        #one collector per matched document, created on its first match
+        collectors = {}
+        for j, key in fingerprint_stream(y, k, self.w):
+            window = None
+            #group the verified postings of this window by document
+            hits = {}
+            for segment in segments:
+                for posting in segment.lookup(key):
+                    number = posting >> OFFSET_BITS
+                    i = posting & OFFSET_MASK
+                    text = texts[number]
+                    #removed documents have no text
+                    if text is None:
+                        continue
+                    if window is None:
+                        window = y[j:j+k]
+                    if text.startswith(window, i):
+                        hits.setdefault(number, []).append(i)
+            #all postings of a document are in one segment, in increasing order
+            for number in sorted(hits):
+                if number not in collectors:
+                    offsets = (self.sourceOffsets[number], yOffsets) if original else None
+                    collectors[number] = MatchCollector(k, spans, offsets)
+                collectors[number].add(j, hits[number])
+
+        return {self.docIds[number]: collectors[number].result() for number in sorted(collectors)}
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Compact K-gram Index
+
+# - The hash tables allocate one HashTableNode per distinct k-gram, holding its key, a next pointer and a list of
+#   indexes. On a multi-megabyte reference text that is millions of objects.
+# - This index keeps the same information in three flat typed arrays, laid out like a CSR matrix:
+#     - fingerprints: the distinct fingerprints, sorted
+#     - offsets: postings of fingerprints[g] are positions[offsets[g]:offsets[g+1]]
+#     - positions: start indexes of the k-grams in the original text, grouped by fingerprint
+# - Substrings are never copied; a k-gram is identified by its start position in the text it was taken from.
+# - An index can be saved to a binary file once and opened with mmap by any number of worker processes.
+#   The arrays are used directly from the mapped pages, so opening the index neither hashes nor copies the corpus.
+#   File layout, all integers little-endian:
+#     - header: magic, format version, k, w (0 without winnowing), number of fingerprints, number of
+#       positions, text length, length of the offset map to the original text (0 if it was not kept)
+#     - fingerprints, offsets, positions and the offset map as 8-byte integers
+#     - the text in UTF-32-LE, so that character i starts at byte 4*i
+
+
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from .rolling_hash import fingerprint_stream
+
+
+MAGIC = b"KGRAMIDX"
+VERSION = 1
+HEADER = struct.Struct("<8sIIqqqqq")
+
+
+class KGramIndex:
+    '''
+    Array-backed index of the k-grams of one text.
+    insert/search follow the semantics of open_addressing_insert/open_addressing_search,
+    except that the substring is implied by its start index in the text.
+    '''
+    def __init__(self, text, k, w = None, sourceOffsets = None):
+        self.text = text
+        self.k = k
+        #winnowing window the index was built with, queries must use the same one
+        self.w = w
+        #offset map of text in the original document, see normalize.py
+        self.sourceOffsets = sourceOffsets
+        #CSR arrays, see the notes at the top of this file
+        self.fingerprints = array('q')
+        self.offsets = array('q', [0])
+        self.positions = array('q')
+        #inserted pairs not yet merged into the CSR arrays
+        self._pending_keys = array('q')
+        self._pending_positions = array('q')
+        #text as UTF-32-LE bytes, the mapped file and its path, only for an index opened with load
+        self.textBytes = None
+        self._mmap = None
+        self.path = None
+
+    @classmethod
+    def from_text(cls, text, k, w = None, sourceOffsets = None):
+        """
+        Build the index of every k-gram of text.
+
+        Input:
+            - text: string, already processed
+            - k: int, length of substring
+            - w: if given, only index the k-grams selected by winnowing with window w
+            - sourceOffsets: optional offset map of text, kept so matches can be reported in original positions
+        Output:
+            - index: KGramIndex
+        """
+        index = cls(text, k, w, sourceOffsets)
+        for i, key in fingerprint_stream(text, k, w):
+            index.insert(key, i)
+        index.build()
+        return index
+
+    def save(self, path):
+        """
+        Write the index to a binary file that load can map into memory.
+
+        Input:
+            - path: file path
+        """
+        self.build()
+        sourceOffsets = self.sourceOffsets if self.sourceOffsets is not None else array('q')
+        textBytes = self.textBytes if self.textBytes is not None else self.text.encode("utf-32-le")
+        sections = [self.fingerprints, self.offsets, self.positions, sourceOffsets]
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.k, self.w or 0, len(self.fingerprints),
+                                len(self.positions), len(textBytes) // 4, len(sourceOffsets)))
+            for section in sections:
+                section = array('q', section)
+                if sys.byteorder != "little":
+                    section.byteswap()
+                f.write(section.tobytes())
+            f.write(textBytes)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Open an index written by save. The file is mapped read-only and shared between processes.
+
+        Input:
+            - path: file path
+        Output:
+            - index: KGramIndex whose arrays are views of the mapped file
+        """
+        if sys.byteorder != "little":
+            raise Exception("Index files can only be mapped on little-endian machines!")
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+
+        magic, version, k, w, numFingerprints, numPositions, textLength, numSourceOffsets = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise Exception("%s is not a k-gram index file!" % path)
+        if version != VERSION:
+            raise Exception("Index file version %d is not supported, expected %d!" % (version, VERSION))
+
+        index = cls(None, k, w or None)
+        #cut the file into sections without copying them
+        start = HEADER.size
+        sections = []
+        for length in (numFingerprints, numFingerprints + 1, numPositions, numSourceOffsets):
+            sections.append(view[start:start + 8 * length].cast('q'))
+            start += 8 * length
+        index.fingerprints, index.offsets, index.positions, sourceOffsets = sections
+        if numSourceOffsets:
+            index.sourceOffsets = sourceOffsets
+        index.textBytes = view[start:start + 4 * textLength]
+        index._mmap = mapped
+        index.path = path
+        return index
+
+    def close(self):
+        """
+        Release the mapped file of an index opened with load.
+        """
+        if self._mmap is None:
+            return
+        #every view of the mapping must be released before it can be closed
+        for view in (self.fingerprints, self.offsets, self.positions, self.sourceOffsets, self.textBytes):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        #number of k-grams stored, including the ones not yet merged
+        return len(self.positions) + len(self._pending_positions)
+
+    def insert(self, key, index):
+        """
+        Register the k-gram starting at index. The arrays are rebuilt lazily on the next search.
+
+        Input:
+            - key: fingerprint of text[index:index+k]
+            - index: start index in the text
+        """
+        self._pending_keys.append(key)
+        self._pending_positions.append(index)
+
+    def build(self):
+        """
+        Merge the pending inserts into the sorted CSR arrays.
+        Postings of the same fingerprint keep their insertion order.
+        """
+        if not self._pending_keys:
+            return
+        self.fingerprints, self.offsets, self.positions = merge_postings(
+            self.fingerprints, self.offsets, self.positions, self._pending_keys, self._pending_positions)
+        self._pending_keys = array('q')
+        self._pending_positions = array('q')
+
+    def lookup(self, key):
+        """
+        Return the start and end offsets of the postings of a fingerprint, without verification.
+
+        Input:
+            - key: fingerprint
+        Output:
+            - (start, end): positions[start:end] are the candidates, empty if key is absent
+        """
+        self.build()
+        return find_postings(self.fingerprints, self.offsets, key)
+
+    def search(self, key, value):
+        """
+        Search for a substring.
+
+        Input:
+            - key: fingerprint of value
+            - value: the substring to look for
+        Output:
+            - list of start indexes of value in the text, or False if it doesn't exist
+        """
+        start, end = self.lookup(key)
+        if start == end:
+            return False
+        return self._verified(start, end, value)
+
+    def search_at(self, key, y, start, verify = True):
+        """
+        Same as search(key, y[start:start+k]), slicing the window only when its fingerprint is in the index.
+
+        Input:
+            - key: fingerprint of y[start:start+k]
+            - y, start: the string searched and the start index of the window
+            - verify: if False, every position with the same fingerprint is returned without comparing the strings
+        Output:
+            - list of start indexes of the window in the text, or False if it doesn't exist
+        """
+        begin, end = self.lookup(key)
+        if begin == end:
+            return False
+        if not verify:
+            return list(self.positions[begin:end])
+        return self._verified(begin, end, y[start:start+self.k])
+
+    def _verified(self, start, end, value):
+        #a fingerprint collision can put different substrings in the same group,
+        #so check each candidate in place without slicing the text
+        if self.text is not None:
+            text = self.text
+            indexes = [i for i in self.positions[start:end] if text.startswith(value, i)]
+        else:
+            #compare with the mapped UTF-32 text, 4 bytes per character
+            encoded = value.encode("utf-32-le")
+            width = len(encoded)
+            textBytes = self.textBytes
+            indexes = [i for i in self.positions[start:end] if textBytes[4*i:4*i+width] == encoded]
+        return indexes or False
+
+    def nbytes(self):
+        #memory held by the arrays, excluding the text itself
+        arrays = (self.fingerprints, self.offsets, self.positions, self._pending_keys, self._pending_positions)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+def merge_postings(fingerprints, offsets, positions, newKeys, newPositions):
+    """
+    Merge new (key, position) pairs into CSR arrays.
+
+    Input:
+        - fingerprints, offsets, positions: existing CSR arrays, see the notes at the top of this file
+        - newKeys, newPositions: arrays of the pairs to add
+    Output:
+        - fingerprints, offsets, positions: new CSR arrays; postings of the same fingerprint keep
+          the existing ones first, then the new ones in the order they were given
+    """
+    #expand the existing groups back into (key, position) pairs
+    keys = array('q')
+    for g in range(len(fingerprints)):
+        keys.extend([fingerprints[g]] * (offsets[g+1] - offsets[g]))
+    keys.extend(newKeys)
+    #copy, the positions may be a view of a mapped file
+    allPositions = array('q', positions)
+    allPositions.extend(newPositions)
+
+    #sort is stable, so equal keys keep the insertion order of their positions
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+
+    mergedFingerprints = array('q')
+    mergedOffsets = array('q')
+    mergedPositions = array('q')
+    previous = None
+    for n, o in enumerate(order):
+        key = keys[o]
+        #start a new group when the fingerprint changes
+        if key != previous:
+            mergedFingerprints.append(key)
+            mergedOffsets.append(n)
+            previous = key
+        mergedPositions.append(allPositions[o])
+    mergedOffsets.append(len(order))
+    return mergedFingerprints, mergedOffsets, mergedPositions
+
+def find_postings(fingerprints, offsets, key):
+    """
+    Binary search of a fingerprint in CSR arrays.
+
+    Output:
+        - (start, end): the postings of key are positions[start:end], empty if key is absent
+    """
+    g = bisect_left(fingerprints, key)
+    if g == len(fingerprints) or fingerprints[g] != key:
+        return 0, 0
+    return offsets[g], offsets[g+1]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Maximal Match Spans
+
+# - Two copied paragraphs of length n produce about n matching (i, j) pairs, one per overlapping k-gram.
+# - Consecutive pairs (i, j), (i+1, j+1), ... lie on the same diagonal i - j. The merger follows every
+#   diagonal while y is searched from left to right and reports each run once, as a span
+#   (x_start, y_start, length) where x[x_start:x_start+length] = y[y_start:y_start+length].
+
+
+from .normalize import to_original
+
+
+class SpanMerger:
+    '''
+    Coalesces the matches of consecutive k-length windows into maximal spans.
+    The matches must be added in increasing order of the y index j.
+    '''
+    def __init__(self, k):
+        self.k = k
+        #runs extended by the last window, keyed by diagonal: diagonal -> (x_start, y_start, number of windows)
+        self.runs = {}
+        self.lastJ = None
+
+    def add(self, j, indexes):
+        """
+        Add the matches of window j.
+
+        Input:
+            - j: start index of the window in y
+            - indexes: start indexes in x where the same substring occurs
+        Output:
+            - list of spans that window j could not extend, so they are complete
+        """
+        #a run can only continue if the previous window was the one right before j
+        previous = self.runs if self.lastJ == j - 1 else {}
+        runs = {}
+        for i in indexes:
+            diagonal = i - j
+            run = previous.pop(diagonal, None)
+            if run is None:
+                #start a new run on this diagonal
+                runs[diagonal] = (i, j, 1)
+            else:
+                runs[diagonal] = (run[0], run[1], run[2] + 1)
+
+        #what is left in self.runs was not extended by window j, so it is finished
+        closed = self._spans(self.runs)
+        self.runs = runs
+        self.lastJ = j
+        return closed
+
+    def close(self):
+        """
+        Finish every run that is still open.
+
+        Output:
+            - list of the remaining spans
+        """
+        closed = self._spans(self.runs)
+        self.runs = {}
+        return closed
+
+    def _spans(self, runs):
+        #a run of n windows covers n + k - 1 characters
+        return [(xStart, yStart, windows + self.k - 1) for xStart, yStart, windows in runs.values()]
+
+
+def sorted_spans(spans):
+    """
+    Sort spans by their start in y, then by their start in x.
+    """
+    return sorted(spans, key=lambda span: (span[1], span[0]))
+
+
+class MatchCollector:
+    '''
+    Collects the matches found while y is searched from left to right, either as (i, j) pairs
+    or as maximal spans, in normalized or in original-text coordinates.
+    '''
+    def __init__(self, k, spans = False, offsets = None):
+        self.spans = spans
+        #(xOffsets, yOffsets) returned by process_string, or None/empty to keep normalized coordinates
+        self.offsets = offsets or None
+        self.merger = SpanMerger(k)
+        self.matches = []
+
+    def add(self, j, indexes):
+        """
+        Add the matches of window j.
+
+        Input:
+            - j: start index of the window in y
+            - indexes: start indexes in x where the same substring occurs
+        """
+        if self.spans:
+            self.matches.extend(self.merger.add(j, indexes))
+        elif self.offsets is None:
+            for i in indexes:
+                self.matches.append((i,j))
+        else:
+            #translate while collecting, so no second pass over the matches is needed
+            xOffsets, yOffsets = self.offsets
+            yPos = yOffsets[j]
+            for i in indexes:
+                self.matches.append((xOffsets[i], yPos))
+
+    def result(self):
+        """
+        Output:
+            - list of (i, j) pairs in the order they were found,
+              or list of spans sorted by their start in y
+        """
+        if not self.spans:
+            return self.matches
+        spans = sorted_spans(self.matches + self.merger.close())
+        if self.offsets is not None:
+            spans = [to_original(span, *self.offsets) for span in spans]
+        return spans
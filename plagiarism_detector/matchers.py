@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Matchers
+
+# - rh_get_match builds an open addressing table of HashTableNode objects, see open_addressing.py. The matchers
+#   here find the same matches with the other engines of the package: the array-backed KGramIndex, the
+#   sort-merge join, NumPy and the suffix automaton.
+# - get_match picks one of them from the lengths of x and y, and multi_get_match matches several values of k
+#   at once.
+
+
+from .kgram_index import KGramIndex
+from .match_spans import MatchCollector
+from .merge_join import join_fingerprints, merge_join
+from .normalize import DEFAULT_NORMALIZER, to_original
+from .open_addressing import process_string, rh_get_match
+from .rolling_hash import collision_probability, fingerprint_stream, prefix_fingerprints, prefix_hashes, winnow
+from .suffix_automaton import SuffixAutomaton
+from .vectorized import load_numpy, vector_matches, vector_spans
+
+
+def compact_get_match(x, y, k, spans = False, w = None, original = False, normalizer = None, collisionProbability = None):
+    """
+    Finds all common length-k substrings of x and y
+    using rolling hashing and the array-backed KGramIndex instead of HashTableNode objects.
+    Input:
+        - x, y: strings
+        - k: int, length of substring
+        - spans: if True, coalesce overlapping matches into maximal spans
+        - w: if given, winnowing window, see rh_get_match
+        - original: if True, report the matches in positions of the original x and y instead of the processed ones
+        - normalizer: Normalizer used to process x and y, see process_string
+        - collisionProbability: see rh_get_match
+    Output:
+        - same as rh_get_match
+    """
+    #process x and index every substring of x by its start position
+    index = build_index(x, k, w, original, normalizer)
+    return index_get_match(index, y, spans, original, normalizer, collisionProbability)
+
+def merge_get_match(x, y, k, spans = False, w = None, original = False, normalizer = None):
+    """
+    Finds all common length-k substrings of x and y
+    by sorting the fingerprints of x and y and joining them in one merge, see merge_join.py.
+    Input:
+        - same as rh_get_match
+    Output:
+        - same as rh_get_match
+    """
+    #process strings
+    x, y, *offsets = process_string(x,y, original, normalizer)
+    return collect_joined(merge_join(x, y, k, w), k, spans, offsets)
+
+def collect_joined(matches, k, spans = False, offsets = None):
+    """
+    Turn the sorted (j, i) pairs of merge_join into the result of rh_get_match.
+    """
+    #duplicate list
+    dup = MatchCollector(k, spans, offsets)
+    
+    #the joined pairs are sorted by j, hand them over one window at a time
+    n = 0
+    while n < len(matches):
+        j = matches[n][0]
+        indexes = []
+        while n < len(matches) and matches[n][0] == j:
+            indexes.append(matches[n][1])
+            n += 1
+        dup.add(j, indexes)
+    return dup.result()
+
+def vector_get_match(x, y, k, spans = False, w = None, original = False, normalizer = None):
+    """
+    Finds all common length-k substrings of x and y
+    using NumPy: all fingerprints are computed at once and looked up in the sorted fingerprints of x.
+    Falls back to compact_get_match when NumPy is not installed.
+    Input:
+        - same as rh_get_match
+    Output:
+        - same as rh_get_match
+    """
+    np = load_numpy()
+    if np is None:
+        return compact_get_match(x, y, k, spans, w, original, normalizer)
+
+    #process strings
+    x, y, *offsets = process_string(x,y, original, normalizer)
+    xs, ys = vector_matches(np, x, y, k, w)
+    
+    if spans:
+        dup = vector_spans(np, xs, ys, k)
+        if offsets:
+            dup = [to_original(span, *offsets) for span in dup]
+        return dup
+    if offsets:
+        #translate all pairs at once
+        xs = np.frombuffer(offsets[0], dtype=np.int64)[xs]
+        ys = np.frombuffer(offsets[1], dtype=np.int64)[ys]
+    return list(zip(xs.tolist(), ys.tolist()))
+
+def sam_get_match(x, y, k, spans = False, original = False, normalizer = None):
+    """
+    Finds all common substrings of x and y of length k or more
+    with the suffix automaton of x, see suffix_automaton.py. There is no k-gram table, so k can be
+    any minimum length, and with spans every maximal common substring is found directly.
+    Input:
+        - x, y: strings
+        - k: int, minimum length of the common substrings
+        - spans: if True, return the maximal common substrings
+        - original: if True, report the matches in positions of the original x and y instead of the processed ones
+        - normalizer: Normalizer used to process x and y, see process_string
+    Output:
+        - same as rh_get_match
+    """
+    #like rh_get_match, there is no substring of length k <= 0 to report
+    if k <= 0:
+        return []
+    
+    #process strings
+    x, y, *offsets = process_string(x,y, original, normalizer)
+    automaton = SuffixAutomaton(x)
+    
+    if spans:
+        dup = automaton.maximal_matches(y, k)
+        if offsets:
+            dup = [to_original(span, *offsets) for span in dup]
+        return dup
+    
+    #duplicate list
+    dup = MatchCollector(k, False, offsets)
+    for j, indexes in automaton.window_matches(y, k):
+        dup.add(j, indexes)
+    return dup.result()
+
+#matchers that get_match can use
+ENGINES = {"hash": rh_get_match, "compact": compact_get_match, "merge": merge_get_match, "vector": vector_get_match}
+
+#below this total length of x and y, NumPy costs more to set up than it saves, see engine_benchmark
+VECTOR_MIN_LENGTH = 256
+
+def choose_engine(xLength, yLength):
+    """
+    Pick the fastest matcher for strings of these lengths, measured with benchmark.engine_benchmark:
+    the NumPy matcher from a few hundred characters if NumPy is installed, the sort-merge join otherwise.
+    The sort-merge join was faster than probing the hash tables at every size and length ratio measured.
+    
+    Input:
+        - xLength, yLength: lengths of x and y
+    Output:
+        - name of a matcher in ENGINES
+    """
+    if xLength + yLength >= VECTOR_MIN_LENGTH and load_numpy() is not None:
+        return "vector"
+    return "merge"
+
+def get_match(x, y, k, spans = False, w = None, original = False, normalizer = None, engine = None):
+    """
+    Finds all common length-k substrings of x and y with the given matcher, or the one choose_engine picks.
+    Input:
+        - x, y, k, spans, w, original, normalizer: see rh_get_match
+        - engine: None, or a name in ENGINES
+    Output:
+        - same as rh_get_match
+    """
+    #check empty string
+    if x == None:
+        raise Exception("String X cannot be empty!")
+    
+    if engine is None:
+        engine = choose_engine(len(x), len(y))
+    if engine not in ENGINES:
+        raise Exception("Unknown engine %r, expected one of %s!" % (engine, ", ".join(ENGINES)))
+    return ENGINES[engine](x, y, k, spans, w, original, normalizer)
+
+def multi_get_match(x, y, ks, spans = False, w = None, original = False, normalizer = None):
+    """
+    Finds all common length-k substrings of x and y for several values of k at once.
+    x and y are processed and hashed once, and the fingerprints of every k come from the same prefix hashes,
+    see rolling_hash.prefix_hashes.
+    Without winnowing only the smallest k is matched: a common substring of length k or more lies in
+    a maximal span of length at least the smallest k, so the matches of every larger k are read off those spans.
+    Input:
+        - x, y: strings
+        - ks: iterable of int, the lengths of substring to try, e.g. (6, 8, 12, 20)
+        - spans, w, original, normalizer: see rh_get_match
+    Output:
+        - dictionary from each k to the result of rh_get_match(x, y, k, ...)
+    """
+    #process strings
+    x, y, *offsets = process_string(x,y, original, normalizer)
+    xPrefixes = prefix_hashes(x)
+    yPrefixes = prefix_hashes(y)
+    
+    def join(k):
+        xPairs = enumerate(prefix_fingerprints(xPrefixes, k))
+        yPairs = enumerate(prefix_fingerprints(yPrefixes, k))
+        if w is not None:
+            xPairs = winnow(xPairs, w)
+            yPairs = winnow(yPairs, w)
+        return join_fingerprints(x, y, k, xPairs, yPairs)
+    
+    ks = list(ks)
+    results = {}
+    if w is not None:
+        #winnowing selects different substrings for every k
+        for k in ks:
+            results[k] = collect_joined(join(k), k, spans, offsets)
+        return results
+    
+    #maximal spans of the smallest k, in processed positions
+    positive = [k for k in ks if k > 0]
+    kMin = min(positive) if positive else 1
+    maximal = collect_joined(join(kMin), kMin, True)
+    for k in ks:
+        #no substring of length 0 or less is matched, like rh_get_match
+        longer = [span for span in maximal if span[2] >= k] if k > 0 else []
+        if spans:
+            results[k] = [to_original(span, *offsets) for span in longer] if offsets else longer
+        else:
+            #every k-window inside a span, in the order rh_get_match finds them
+            matches = sorted((j + t, i + t) for i, j, length in longer for t in range(length - k + 1))
+            results[k] = collect_joined(matches, k, False, offsets)
+    return results
+
+def build_index(x, k, w = None, original = False, normalizer = None):
+    """
+    Processes x and builds the KGramIndex of its length-k substrings.
+    The index can be saved with index.save(path) and opened by other processes with KGramIndex.load(path).
+    
+    Input:
+        - x: string
+        - k: int, length of substring
+        - w: if given, winnowing window, see rh_get_match
+        - original: if True, keep the offset map of x so matches can be reported in its original positions
+        - normalizer: Normalizer used to process x, see process_string
+    Output:
+        - index: KGramIndex
+    """
+    #check empty string
+    if x == None:
+        raise Exception("String X cannot be empty!")
+    
+    if normalizer is None:
+        normalizer = DEFAULT_NORMALIZER
+    if original:
+        x, xOffsets = normalizer.normalize(x, offsets = True)
+        return KGramIndex.from_text(x, k, w, xOffsets)
+    return KGramIndex.from_text(normalizer.normalize(x), k, w)
+
+def index_get_match(index, y, spans = False, original = False, normalizer = None, collisionProbability = None):
+    """
+    Finds all common substrings of an indexed string x and y.
+    k and the winnowing window are the ones the index was built with.
+    
+    Input:
+        - index: KGramIndex from build_index or KGramIndex.load
+        - y: string
+        - spans: if True, coalesce overlapping matches into maximal spans
+        - original: if True, report the matches in original positions; the index must have been built with original=True
+        - normalizer: Normalizer used to process y, must be the one x was processed with
+        - collisionProbability: see rh_get_match
+    Output:
+        - same as rh_get_match
+    """
+    if normalizer is None:
+        normalizer = DEFAULT_NORMALIZER
+    k = index.k
+    
+    offsets = None
+    if original:
+        if index.sourceOffsets is None:
+            raise Exception("The index was built without the offsets of the original string!")
+        y, yOffsets = normalizer.normalize(y, offsets = True)
+        offsets = (index.sourceOffsets, yOffsets)
+    else:
+        y = normalizer.normalize(y)
+
+    #fingerprint matches are checked against the strings unless a collision is unlikely enough
+    verify = (collisionProbability is None
+              or collision_probability(len(index), max(len(y) - k + 1, 0)) > collisionProbability)
+
+    #duplicate list
+    dup = MatchCollector(k, spans, offsets)
+
+    #search duplicate substring from y, the window is only sliced when its fingerprint is in the index
+    for j, key in fingerprint_stream(y, k, index.w):
+        indexes = index.search_at(key, y, j, verify)
+        if indexes:
+            dup.add(j, indexes)
+    return dup.result()
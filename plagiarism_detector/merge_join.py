@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Sort-Merge Join
+
+# - rh_get_match probes the hash table once per window of y, and every probe follows HashTableNode objects
+#   scattered in memory.
+# - Here the (position, fingerprint) pairs of x and of y are each sorted by fingerprint, with the sort of the
+#   interpreter, and the two sorted lists are joined in one merge: equal fingerprints meet in order, so no
+#   table is built and no key is probed at random.
+# - When one side has far fewer distinct fingerprints, the merge jumps over the other side with a binary
+#   search instead of stepping through it, so a short y against a long x stays cheap.
+
+
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+from .rolling_hash import fingerprint_stream
+
+
+def sorted_fingerprints(pairs):
+    """
+    Input:
+        - pairs: iterable of (position, fingerprint), e.g. fingerprint_stream(x, k, w)
+    Output:
+        - keys: list of the fingerprints, sorted
+        - positions: list of the matching positions, increasing among equal fingerprints
+    """
+    #the sort is stable, so the positions of equal fingerprints stay increasing
+    pairs = sorted(pairs, key=itemgetter(1))
+    return [fp for _, fp in pairs], [pos for pos, _ in pairs]
+
+def merge_join(x, y, k, w = None):
+    """
+    Find every common length-k substring of two processed strings by joining their sorted fingerprints.
+
+    Input:
+        - x, y: processed strings
+        - k: int, length of substring
+        - w: if given, winnowing window, see rh_get_match
+    Output:
+        - list of (j, i) where x[i:i+k] = y[j:j+k], sorted, so in the order rh_get_match finds them
+    """
+    return join_fingerprints(x, y, k, fingerprint_stream(x, k, w), fingerprint_stream(y, k, w))
+
+def join_fingerprints(x, y, k, xPairs, yPairs):
+    """
+    Same as merge_join, with the (position, fingerprint) pairs of x and y already computed.
+    """
+    xKeys, xPositions = sorted_fingerprints(xPairs)
+    yKeys, yPositions = sorted_fingerprints(yPairs)
+
+    matches = []
+    a = 0
+    b = 0
+    while a < len(xKeys) and b < len(yKeys):
+        xKey = xKeys[a]
+        yKey = yKeys[b]
+        #jump to the first fingerprint that can be equal on the other side
+        if xKey < yKey:
+            a = bisect_left(xKeys, yKey, a)
+            continue
+        if yKey < xKey:
+            b = bisect_left(yKeys, xKey, b)
+            continue
+        aEnd = bisect_right(xKeys, xKey, a)
+        bEnd = bisect_right(yKeys, yKey, b)
+        #a fingerprint collision can put different substrings in the same group, so verify each pair
+        for j in yPositions[b:bEnd]:
+            sub = y[j:j+k]
+            for i in xPositions[a:aEnd]:
+                if x.startswith(sub, i):
+                    matches.append((j, i))
+        a = aEnd
+        b = bEnd
+
+    matches.sort()
+    return matches
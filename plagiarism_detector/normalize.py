@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Text Normalization
+
+# - process_string removes blank spaces and lowercases the letters, so the matches refer to positions in the
+#   processed strings.
+# - To highlight a match in the original document we also keep an offset map: offsets[p] is the position in the
+#   original text of the character at position p of the normalized text.
+# - A Normalizer is built from rules. A rule maps one character to a string: itself, a replacement, several
+#   characters, or "" to delete it. The rules are compiled into one str.translate table that is filled the
+#   first time each character is seen, so normalizing a text is a single pass at C speed.
+# - Because every rule looks at one character at a time, a text can be normalized chunk by chunk.
+
+
+import unicodedata
+from array import array
+from itertools import chain, compress, repeat
+
+
+# ### Rules
+
+def remove_spaces(char):
+    #the original behaviour of process_string: only the ASCII blank space is removed
+    return "" if char == " " else char
+
+def remove_whitespace(char):
+    #tabs, newlines and Unicode spaces such as the no-break space
+    return "" if char.isspace() else char
+
+def remove_punctuation(char):
+    #every character in a Unicode punctuation category
+    return "" if unicodedata.category(char).startswith("P") else char
+
+def lowercase(char):
+    return char.lower()
+
+def casefold(char):
+    #stronger than lowercase, e.g. "ß" becomes "ss"
+    return char.casefold()
+
+def nfkc(char):
+    #compatibility forms such as ligatures, full-width letters and superscripts, e.g. "ﬁ" becomes "fi"
+    return unicodedata.normalize("NFKC", char)
+
+def strip_accents(char):
+    #decompose the character and drop the combining marks, e.g. "é" becomes "e"
+    return "".join(c for c in unicodedata.normalize("NFKD", char) if not unicodedata.combining(c))
+
+def fold_digits(char):
+    #every decimal digit, in any script, becomes "0"
+    return "0" if char.isdecimal() else char
+
+#same result as the original process_string, except that a final sigma is lowercased like any other sigma
+DEFAULT_RULES = (remove_spaces, lowercase)
+#for documents that were copied with different formatting, accents or numbering
+STRICT_RULES = (nfkc, casefold, strip_accents, remove_whitespace, remove_punctuation, fold_digits)
+
+
+class RuleTable(dict):
+    '''
+    Translation table for str.translate that applies the rules to a character the first time it is seen.
+    '''
+    def __init__(self, rules):
+        super().__init__()
+        self.rules = rules
+        #second translation table: the number of output characters of every character seen so far
+        self.widths = {}
+        #True once a character became several characters
+        self.expands = False
+
+    def __missing__(self, code):
+        out = chr(code)
+        #each rule is applied to every character produced by the previous rules
+        for rule in self.rules:
+            out = "".join(rule(c) for c in out)
+        self.widths[code] = len(out)
+        #str.translate is much faster with ordinals and None than with strings
+        if len(out) == 1:
+            value = ord(out)
+        elif out == "":
+            value = None
+        else:
+            value = out
+            self.expands = True
+        self[code] = value
+        return value
+
+
+class Normalizer:
+    '''
+    Single-pass text normalization built from a sequence of rules.
+    '''
+    def __init__(self, rules = DEFAULT_RULES):
+        self.rules = tuple(rules)
+        self.table = RuleTable(self.rules)
+
+    def normalize(self, text, offsets = False):
+        """
+        Input:
+            - text: string
+            - offsets: if True, also return the offset map
+        Output:
+            - normalized: the text after all rules
+            - offsets: only if offsets is True, array of the original position of each character of normalized
+        """
+        normalized = text.translate(self.table)
+        if not offsets:
+            return normalized
+        return normalized, self._offsets(text, 0)
+
+    def _offsets(self, text, start):
+        #translate has seen every character of text, so all widths are known
+        widths = text.translate(self.table.widths).encode("latin-1")
+        positions = range(start, start + len(text))
+        if not self.table.expands:
+            #widths are 0 or 1: keep the positions of the characters that were not removed
+            return array('q', compress(positions, widths))
+        #position p is repeated once per output character
+        return array('q', chain.from_iterable(map(repeat, positions, widths)))
+
+    def stream(self, chunks, offsets = False):
+        """
+        Normalize a large text given as an iterable of chunks, without joining it.
+
+        Input:
+            - chunks: iterable of strings, e.g. an open text file
+            - offsets: if True, also yield the offset map of each chunk
+        Output:
+            - yields the normalized chunks,
+              or (normalized, offsets) pairs where offsets are positions in the whole text
+        """
+        start = 0
+        for chunk in chunks:
+            normalized = chunk.translate(self.table)
+            if offsets:
+                #positions continue from the previous chunks
+                yield normalized, self._offsets(chunk, start)
+            else:
+                yield normalized
+            start += len(chunk)
+
+DEFAULT_NORMALIZER = Normalizer()
+
+
+def normalize(text):
+    """
+    Remove blank spaces and lowercase all letters, keeping track of where every character came from.
+
+    Input:
+        - text: string
+    Output:
+        - normalized: processed string, same as process_string
+        - offsets: array of the original position of each character of normalized
+    """
+    return DEFAULT_NORMALIZER.normalize(text, offsets = True)
+
+def to_original(match, xOffsets, yOffsets):
+    """
+    Translate a match from normalized coordinates to original-text coordinates.
+
+    Input:
+        - match: (i, j) pair, or (i, j, length) span
+        - xOffsets, yOffsets: offset maps of x and y returned by normalize
+    Output:
+        - (i, j) pair, or (i, j, x_length, y_length) span where the lengths count original characters,
+          including the removed blank spaces inside the span
+    """
+    if len(match) == 2:
+        return xOffsets[match[0]], yOffsets[match[1]]
+    i, j, length = match
+    xStart = xOffsets[i]
+    yStart = yOffsets[j]
+    return xStart, yStart, xOffsets[i + length - 1] + 1 - xStart, yOffsets[j + length - 1] + 1 - yStart
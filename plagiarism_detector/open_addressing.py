@@ -0,0 +1,474 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Open Addressing Hash Table
+
+# - I choose the double hashing in open adressing method to avoid colluision. 
+# - In the Rolling Hashing technique, I first chose q to be 10, following the example provided in "All you need to know about hashing (to build a plagiarism detector)"(Nguyen & Tran, 2021). With only ten distinct keys every probe sequence turned into a linear scan, so the hash values now come from the Rabin-Karp engine in rolling_hash.py, which packs two large prime moduli into one 64-bit fingerprint.
+# - For the hash table size, I choose it to be a prime number bigger than 1.3 times the maximum keys to be inserted in the table because it is considered a general "rule of thumb"("Hash table size", 2021). The rolling_table_size function will calculate the hash table. 
+# - The table is no longer fixed at that size: once more than max_load of the slots are filled it moves its nodes into a table sized for twice as many keys, reusing the stored keys instead of hashing the substrings again. Every size is rounded up to a prime so a probe sequence can reach every slot, and an insert never fails: with max_load None the table only grows once it is full. The lookups and probes counters show how long the probe sequences get.
+# - rh_get_match no longer slices every window: the nodes keep only the start positions in x, and a window is sliced only to verify a node with the same fingerprint. With collisionProbability the fingerprints are trusted without that check when a false match is unlikely enough.
+
+
+from .match_spans import MatchCollector
+from .normalize import DEFAULT_NORMALIZER
+from .rolling_hash import check_window, collision_probability, fingerprint, fingerprint_stream, rolling_fingerprints
+from .stats import phase
+
+
+class HashTableNode:
+    '''
+    This hash table node stores the key and value pairs.
+    
+    Innput:
+        - key: the hash number of substring
+        - value: the substring
+        - index: start index in the original string
+    '''
+    #one node per distinct substring, so no per-node __dict__
+    __slots__ = ("key", "value", "indexes", "next")
+
+    def __init__(self, key, value,index,nextNode = None):
+        self.key = key
+        self.value = value
+        self.indexes = []
+        self.indexes.append(index)
+        #Q2
+        self.next = nextNode
+    
+class HashTable:
+    '''
+    This hash table uses open addressing to avoid collision. Each slot in the hashtable will only hold 1 element.
+    Double Hashing is used to probe the hashtable.
+    Source: Ha Nguyen and Quang Tran, “All you need to know about hashing (to build a plagiarism detector)”
+    '''
+    def __init__(self, m, max_load = 0.8, stats = None, text = None, k = None):
+        #initialize the table, with a prime size so every probe sequence visits every slot
+        m = next_prime(m)
+        self.capacity = m
+        self.hash_table = [None for _ in range(m)]
+        #the table grows once more than max_load of its slots are filled, with None only once it is full
+        self.max_load = max_load
+        #number of filled slots
+        self.size = 0
+        #counters to watch clustering: probes / lookups is the average probe sequence length
+        self.lookups = 0
+        self.probes = 0
+        self.resizes = 0
+        #MatchStats that records every probe sequence, or None
+        self.stats = stats
+        #string whose k-grams position_insert stores by start index only
+        self.text = text
+        self.k = k
+
+    def double_hashing(self, key, i):
+        #since our i keeps increasing by 1
+        #we keep searching the next slot until we find an empty slot
+        return (self.hash_function_1(key) + i * self.hash_function_2(key)) % self.capacity
+
+    def hash_function_1(self, k):
+        return k % self.capacity
+    def hash_function_2(self, k):
+        return 1 + k % (self.capacity - 1)
+    
+    def load_factor(self):
+        return self.size / self.capacity
+
+    def probes_per_lookup(self):
+        #average number of slots visited by insert and search
+        if self.lookups == 0:
+            return 0
+        return self.probes / self.lookups
+
+    def resize(self, m):
+        """
+        Move every node into a new table with at least m slots, rounded up to a prime.
+        The nodes keep their stored keys, so no substring is hashed again.
+        """
+        oldTable = self.hash_table
+        m = next_prime(m)
+        while True:
+            self.capacity = m
+            self.hash_table = [None for _ in range(m)]
+            for node in oldTable:
+                if node is not None and not self._place(node):
+                    #a probe sequence ran out of slots, start over with a bigger table
+                    m = rolling_table_size(2 * m)
+                    break
+            else:
+                break
+        self.resizes += 1
+
+    def _place(self, node):
+        #put a node in the first empty slot of its probe sequence, False if it visits no empty slot
+        i=0
+        while i < self.capacity:
+            j = self.double_hashing(node.key, i)
+            if self.hash_table[j] is None:
+                self.hash_table[j] = node
+                return True
+            i += 1
+        return False
+    
+    def _reserve(self):
+        #True if one more node would push the load factor over max_load
+        return self.max_load is not None and self.size + 1 > self.max_load * self.capacity
+
+    def _grow(self, node):
+        #amortized O(1): the new table has room for twice the current keys
+        self.resize(rolling_table_size(2 * (self.size + 1)))
+        while not self._place(node):
+            self.resize(rolling_table_size(2 * self.capacity))
+        self.size += 1
+
+    def _add(self, node, j):
+        #store a new node in the empty slot j, or in a grown table if it would get too full
+        if self._reserve():
+            self._grow(node)
+        else:
+            self.hash_table[j] = node
+            self.size += 1
+
+    def open_addressing_insert(self, key, value, index): 
+        self.lookups += 1
+        i=0
+        while i < self.capacity:
+            j = self.double_hashing(key, i)
+            #if we find an empty slot
+            if self.hash_table[j] is None:
+                #we insert the key-value pair into the hash table, growing it first if needed
+                self._add(HashTableNode(key, value, index), j)
+                self.probes += i + 1
+                if self.stats is not None:
+                    self.stats.insert_probes[i + 1] += 1
+                return
+            #if already registared, record it in the index list 
+            if self.hash_table[j].value == value:
+                self.hash_table[j].indexes.append(index)
+                self.probes += i + 1
+                if self.stats is not None:
+                    self.stats.insert_probes[i + 1] += 1
+                return
+            #else we increase i and continue probing
+            i += 1
+        #every slot was probed, so the table is full: grow it instead of giving up
+        self.probes += i
+        if self.stats is not None:
+            self.stats.insert_probes[i] += 1
+        self._grow(HashTableNode(key, value, index))
+        
+    def open_addressing_search(self, key, value): 
+        self.lookups += 1
+        i=0
+        while i < self.capacity:
+          #we go through all slots
+            j = self.double_hashing(key, i)
+            node = self.hash_table[j]
+            if node is None:
+                #until we find an empty one, which means the value doesn't exist
+                self.probes += i + 1
+                if self.stats is not None:
+                    self.stats.search_probes[i + 1] += 1
+                return False
+            if node.key == key:
+                if value == node.value:
+                    #or we find the value itself          
+                    self.probes += i + 1
+                    if self.stats is not None:
+                        self.stats.search_probes[i + 1] += 1
+                        self.stats.comparisons += 1
+                    return node.indexes
+                #same fingerprint, different substring
+                if self.stats is not None:
+                    self.stats.comparisons += 1
+                    self.stats.collisions += 1
+            i += 1
+        self.probes += i
+        return False
+
+    def position_insert(self, key, index, verify = True):
+        """
+        Same as open_addressing_insert(key, text[index:index+k], index) for the text the table was made with,
+        without slicing the substring: the node stores no value, its first index stands for the substring.
+
+        Input:
+            - key: fingerprint of text[index:index+k]
+            - index: start index of the substring
+            - verify: if False, a node with the same key is taken to hold the same substring
+        """
+        self.lookups += 1
+        text = self.text
+        i=0
+        while i < self.capacity:
+            j = self.double_hashing(key, i)
+            node = self.hash_table[j]
+            if node is None:
+                self._add(HashTableNode(key, None, index), j)
+                self.probes += i + 1
+                if self.stats is not None:
+                    self.stats.insert_probes[i + 1] += 1
+                return
+            #the substring is only sliced when the fingerprints are equal, to rule out a collision
+            if node.key == key and (not verify or text.startswith(text[index:index+self.k], node.indexes[0])):
+                node.indexes.append(index)
+                self.probes += i + 1
+                if self.stats is not None:
+                    self.stats.insert_probes[i + 1] += 1
+                return
+            i += 1
+        #every slot was probed, so the table is full: grow it instead of giving up
+        self.probes += i
+        if self.stats is not None:
+            self.stats.insert_probes[i] += 1
+        self._grow(HashTableNode(key, None, index))
+
+    def position_search(self, key, y, start, verify = True):
+        """
+        Same as open_addressing_search(key, y[start:start+k]) for a table filled by position_insert.
+
+        Input:
+            - key: fingerprint of y[start:start+k]
+            - y, start: the string searched and the start index of the window
+            - verify: if False, a node with the same key is taken to hold the same substring
+        Output:
+            - list of start indexes in text, or False if the window doesn't occur
+        """
+        self.lookups += 1
+        i=0
+        while i < self.capacity:
+            j = self.double_hashing(key, i)
+            node = self.hash_table[j]
+            if node is None:
+                self.probes += i + 1
+                if self.stats is not None:
+                    self.stats.search_probes[i + 1] += 1
+                return False
+            if node.key == key:
+                #the window of y is only sliced for a node with the same fingerprint
+                if not verify or self.text.startswith(y[start:start+self.k], node.indexes[0]):
+                    self.probes += i + 1
+                    if self.stats is not None:
+                        self.stats.search_probes[i + 1] += 1
+                        if verify:
+                            self.stats.comparisons += 1
+                    return node.indexes
+                #same fingerprint, different substring
+                if self.stats is not None:
+                    self.stats.comparisons += 1
+                    self.stats.collisions += 1
+            i += 1
+        self.probes += i
+        return False
+
+
+def process_string(x,y, offsets = False, normalizer = None):
+    """
+    get rid of the blank space in string x and y and lowercase all letters
+    
+    Input:
+        - x, y: strings
+        - offsets: if True, also return where each processed character was in the original string
+        - normalizer: a Normalizer with other rules, e.g. Normalizer(STRICT_RULES) also removes tabs, newlines,
+          punctuation and accents in the same pass
+    Output: 
+        - x1, y1: processed string with no blank space and all letters lowercased.
+        - xOffsets, yOffsets: only if offsets is True, arrays where xOffsets[p] is the position of x1[p] in x
+    """
+    #check empty string
+    if x == None:
+        raise Exception("String X cannot be empty!")
+    
+    if normalizer is None:
+        normalizer = DEFAULT_NORMALIZER
+    
+    #x1, y1 will hold the processed strings
+    if offsets:
+        x1, xOffsets = normalizer.normalize(x, offsets = True)
+        y1, yOffsets = normalizer.normalize(y, offsets = True)
+        return x1, y1, xOffsets, yOffsets
+    
+    x1 = normalizer.normalize(x)
+    y1 = normalizer.normalize(y)
+    return x1, y1
+
+def str_to_int(sub):
+    """
+    This function will convert a substring into integer value.
+    
+    Input:
+        - sub: strings
+    Output:
+        - num: the integer that substring is converted to
+    """
+    num = 0
+    base = 7
+    k = len(sub)
+    
+    #loop through each character
+    for i in range(k):
+        #the exponent
+        exp = k-1-i
+        #repeatly add 
+        num += ord(sub[i]) * base ** exp
+
+    return num
+
+def _hash(sub):
+    """
+    This function will produce hash value for each sub_string.
+    
+    Input:
+        - sub: sub string to be converted
+    Output:
+        - hash value, the 64-bit Rabin-Karp fingerprint of sub
+    """    
+    return fingerprint(sub)
+    
+def rolling_hashing(x,k):
+    """
+    This function will produce hash value for every k-length substring using rolling hashing technique
+    
+    Input:
+        - x: strings
+        - k: length of substring 
+    Output:
+        - a list of hash values of each substring
+    """
+    #each roll costs O(1), see rolling_hash.py
+    return rolling_fingerprints(x, k)
+
+#bases that make Miller-Rabin exact for every n below 3.3 * 10^24
+MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+def is_prime(n):
+    """
+    Deterministic Miller-Rabin primality test.
+    
+    Input:
+        - n: int
+    Output:
+        - True if n is a prime number
+    """
+    if n < 2:
+        return False
+    #small primes and their multiples
+    for p in MR_BASES:
+        if n % p == 0:
+            return n == p
+    
+    #write n-1 as d * 2^s with d odd
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    
+    for a in MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            #a is a witness that n is composite
+            return False
+    return True
+
+def next_prime(n):
+    """
+    Returns the smallest prime number bigger than or equal to n.
+    """
+    if n <= 2:
+        return 2
+    #only odd numbers can be prime
+    q = n | 1
+    while not is_prime(q):
+        q += 2
+    return q
+
+def rolling_table_size(keyNum):
+    """
+    Finds the appropriate table size for a given length of strings. The table size should be around 1.3 times
+    the number of keys in the table and it should be a prime number.
+    
+    Input:
+        - l: length of string
+    Output:
+        - q: table size
+    """
+    #minimum length
+    minL = int(keyNum * 1.3)
+    
+    #find the next prime number bigger than minimum length
+    #primes are on average ln(q) apart, so only a handful of Miller-Rabin tests are needed
+    return next_prime(minL)
+
+def rh_get_match(x, y, k, spans = False, w = None, original = False, normalizer = None, stats = None,
+                 collisionProbability = None):
+    """
+    Finds all common length-k substrings of x and y
+    using rolling hashing on strings.
+    Input:
+        - x, y: strings
+        - k: int, length of substring
+        - spans: if True, coalesce overlapping matches into maximal spans
+        - w: if given, only the substrings selected by winnowing with window w are indexed and searched.
+          Every common substring of length w+k-1 or more is still found at least once.
+        - original: if True, report the matches in positions of the original x and y instead of the processed ones
+        - normalizer: Normalizer used to process x and y, see process_string
+        - stats: if given, a MatchStats that records the probes, collisions and phase timings, see stats.py
+        - collisionProbability: if given, equal fingerprints are not verified against the strings when the estimated
+          chance that any of them is a collision is below this, see rolling_hash.collision_probability
+    Output:
+        - A list of tuples (i, j) where x[i:i+k] = y[j:j+k]
+        - or if spans is True, a list of tuples (i, j, length) where x[i:i+length] = y[j:j+length]
+        - if original is True, spans become (i, j, x_length, y_length) counted in original characters
+    """
+    #process strings
+    with phase(stats, "normalize"):
+        x, y, *offsets = process_string(x,y, original, normalizer)
+    
+    with phase(stats, "index"):
+        #calculate hash table length
+        keyNum = len(x) - k + 1
+        if w is not None:
+            check_window(w)
+            #winnowing keeps about 2/(w+1) of the substrings
+            keyNum = 2 * keyNum // (w + 1) + 1
+        size = rolling_table_size(keyNum)
+        
+        #fingerprint matches are checked against the strings unless a collision is unlikely enough
+        verify = (collisionProbability is None
+                  or collision_probability(max(len(x) - k + 1, 0), max(len(y) - k + 1, 0)) > collisionProbability)
+        
+        #create hash table, its nodes only keep the positions of the substrings in x
+        hTable1 = HashTable(size, stats = stats, text = x, k = k)
+        
+        #hash every substring and append it in the table
+        for i, key in fingerprint_stream(x, k, w):
+            hTable1.position_insert(key, i, verify)
+
+    #duplicate list, coalesced into spans and translated to original positions as requested
+    dup = MatchCollector(k, spans, offsets)
+    
+    with phase(stats, "query"):
+        #search duplicate substring from y, rolling the hash the same way as for x
+        for j, key in fingerprint_stream(y, k, w):
+            #if duplicate sub_string is found, search will return the duplicate substrings index list
+            indexes = hTable1.position_search(key, y, j, verify)
+            if indexes:
+                dup.add(j, indexes)
+
+    with phase(stats, "merge"):
+        result = dup.result()
+    if stats is not None:
+        stats.record_table(hTable1.size, hTable1.capacity, hTable1.resizes)
+    return result
+
+
+# Nguyen, H., Tran, Q. (2021). “All you need to know about hashing (to build a plagiarism detector)". Minerva University.
+# 
+# 
+# "Hash Table Size". (2021). University of California, San Diego CSE Department. Retrieved from https://cseweb.ucsd.edu/~kube/cls/100/Lectures/lec16/lec16-8.html
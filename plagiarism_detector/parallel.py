@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Parallel Queries
+
+# - Searching y is pure Python, so one query keeps a single core busy however many the machine has.
+# - The windows of y are cut into shards that are searched by a pool of worker processes. The reference index
+#   is not pickled into the tasks: it is saved to a file once and every worker opens it with KGramIndex.load,
+#   so all workers read the same mapped pages.
+# - A shard of windows [start, end) needs the characters y[start:end+k-1], so neighbouring shards overlap by
+#   k-1 characters. With winnowing, whether a window is selected depends on the w-1 windows on each side,
+#   so the shard also hashes those windows and keeps only the selections inside [start, end).
+# - The workers only return the raw (j, indexes) lookups. They are fed to one MatchCollector in the order of y,
+#   so the output is exactly the one of index_get_match, spans included.
+# - Building the index of a large x is split in two rounds of tasks:
+#     - every worker fingerprints one shard of x and puts each k-gram in one of B buckets by fingerprint range
+#     - every worker takes one bucket from all shards, in the order of x, and sorts it into CSR arrays
+#   The buckets cover increasing ranges of fingerprints, so the sorted buckets only need to be concatenated.
+# - The process pool pulls in multiprocessing, which takes longer to import than the rest of the package, so
+#   it is only imported by the functions that start one.
+
+
+import math
+import os
+from array import array
+
+from .kgram_index import KGramIndex, merge_postings
+from .match_spans import MatchCollector
+from .normalize import DEFAULT_NORMALIZER
+from .rolling_hash import fingerprint_stream
+
+
+#fewest windows in a task, so the cost of sending a task stays small next to searching it
+MIN_CHUNK = 1000
+
+#index opened by each worker process
+_index = None
+
+
+def _init_worker(path):
+    global _index
+    _index = KGramIndex.load(path)
+
+def _search_shard(task):
+    """
+    Search one shard of y in the index of the worker.
+
+    Input:
+        - task: (chunk, lo, start, end) where chunk = y[lo:...] and the shard is the windows start to end-1
+    Output:
+        - (js, counts, indexes): typed arrays, window js[n] was found at the next counts[n] positions of indexes,
+          in increasing order of j; flat arrays are much cheaper to send back than lists of lists
+    """
+    chunk, lo, start, end = task
+    k = _index.k
+    js = array('q')
+    counts = array('q')
+    allIndexes = array('q')
+    for pos, key in fingerprint_stream(chunk, k, _index.w):
+        j = lo + pos
+        #windows of the overlap only decide the winnowing selection
+        if j < start or j >= end:
+            continue
+        indexes = _index.search_at(key, chunk, pos)
+        if indexes:
+            js.append(j)
+            counts.append(len(indexes))
+            allIndexes.extend(indexes)
+    return js, counts, allIndexes
+
+def _bucket_shard(task):
+    """
+    Fingerprint one shard of x and split its k-grams into buckets by fingerprint range.
+
+    Input:
+        - task: (chunk, lo, start, end, k, w, buckets) where chunk = x[lo:...] and the shard is the windows
+          start to end-1
+    Output:
+        - list of (keys, positions) typed arrays, one per bucket
+    """
+    chunk, lo, start, end, k, w, buckets = task
+    parts = [(array('q'), array('q')) for _ in range(buckets)]
+    for pos, key in fingerprint_stream(chunk, k, w):
+        i = lo + pos
+        #windows of the overlap only decide the winnowing selection
+        if start <= i < end:
+            #the high half of a fingerprint is uniform below 2^31
+            keys, positions = parts[(key >> 32) * buckets >> 31]
+            keys.append(key)
+            positions.append(i)
+    return parts
+
+def _sort_bucket(parts):
+    """
+    Sort the k-grams of one bucket, given by every shard in the order of x, into CSR arrays.
+    """
+    keys = array('q')
+    positions = array('q')
+    for shardKeys, shardPositions in parts:
+        keys.extend(shardKeys)
+        positions.extend(shardPositions)
+    #the sort is stable, so the positions of a fingerprint stay increasing
+    return merge_postings(array('q'), array('q', [0]), array('q'), keys, positions)
+
+def shard_windows(n, k, w, chunkSize):
+    """
+    Cut the windows of a string of length n into shards.
+
+    Input:
+        - n: length of the processed string
+        - k: int, length of substring
+        - w: winnowing window or None
+        - chunkSize: number of windows per shard
+    Output:
+        - list of (lo, hi, start, end): the shard is the windows start to end-1,
+          and the characters lo to hi-1 are enough to search it
+    """
+    windows = n - k + 1
+    #windows on each side that can change the winnowing selection
+    overlap = w - 1 if w is not None else 0
+    shards = []
+    for start in range(0, max(windows, 0), chunkSize):
+        end = min(start + chunkSize, windows)
+        lo = max(0, start - overlap)
+        hi = min(windows, end + overlap) + k - 1
+        shards.append((lo, hi, start, end))
+    return shards
+
+
+class SharedIndex:
+    '''
+    A KGramIndex saved to a file that worker processes can map.
+    An index that was not opened from a file is saved to a temporary one, removed on close.
+    An index given by its path is opened here and closed on close.
+    '''
+    def __init__(self, index):
+        self.temporary = None
+        self.opened = isinstance(index, (str, os.PathLike))
+        if self.opened:
+            index = KGramIndex.load(index)
+        elif index.path is None:
+            import tempfile
+            fd, self.temporary = tempfile.mkstemp(suffix=".kgram")
+            os.close(fd)
+            index.save(self.temporary)
+        self.index = index
+        self.path = index.path if self.temporary is None else self.temporary
+
+    def close(self):
+        if self.opened:
+            self.index.close()
+            self.opened = False
+        if self.temporary is not None:
+            os.remove(self.temporary)
+            self.temporary = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parallel_query(index, documents, spans = False, original = False, normalizer = None, workers = None, chunkSize = None):
+    """
+    Finds the common substrings of an indexed string x and each document, using a pool of processes.
+
+    Input:
+        - index: KGramIndex from build_index, or the path of an index saved with index.save
+        - documents: list of strings
+        - spans, original, normalizer: see index_get_match
+        - workers: number of processes, by default the number of CPUs
+        - chunkSize: number of windows searched by one task, by default enough for about 4 tasks per worker
+    Output:
+        - list with the matches of each document, each the same as index_get_match(index, document, ...)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if normalizer is None:
+        normalizer = DEFAULT_NORMALIZER
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with SharedIndex(index) as shared:
+        index = shared.index
+        k = index.k
+        if original and index.sourceOffsets is None:
+            raise Exception("The index was built without the offsets of the original string!")
+
+        #y is processed here, the offset maps are only needed to collect the matches
+        processed = []
+        for y in documents:
+            processed.append(normalizer.normalize(y, offsets = True) if original else (normalizer.normalize(y), None))
+
+        if chunkSize is None:
+            totalWindows = sum(max(len(y) - k + 1, 0) for y, _ in processed)
+            chunkSize = max(MIN_CHUNK, math.ceil(totalWindows / (4 * workers)))
+
+        #one task per shard, the shards of every document in order
+        tasks = []
+        owners = []
+        for number, (y, _) in enumerate(processed):
+            for lo, hi, start, end in shard_windows(len(y), k, index.w, chunkSize):
+                tasks.append((y[lo:hi], lo, start, end))
+                owners.append(number)
+
+        collectors = []
+        for y, yOffsets in processed:
+            collectors.append(MatchCollector(k, spans, (index.sourceOffsets, yOffsets) if original else None))
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(shared.path,)) as pool:
+            #map returns the results in the order of the tasks, so y is collected from left to right
+            for number, (js, counts, indexes) in zip(owners, pool.map(_search_shard, tasks)):
+                dup = collectors[number]
+                n = 0
+                for j, count in zip(js, counts):
+                    dup.add(j, indexes[n:n+count])
+                    n += count
+        return [dup.result() for dup in collectors]
+
+def parallel_get_match(index, y, spans = False, original = False, normalizer = None, workers = None, chunkSize = None):
+    """
+    Same as index_get_match, with the windows of y searched by a pool of processes.
+
+    Input:
+        - see parallel_query
+    Output:
+        - same as index_get_match
+    """
+    return parallel_query(index, [y], spans, original, normalizer, workers, chunkSize)[0]
+
+def parallel_build_index(x, k, w = None, original = False, normalizer = None, workers = None, chunkSize = None):
+    """
+    Same as build_index, with the k-grams of x fingerprinted and sorted by a pool of processes.
+
+    Input:
+        - x, k, w, original, normalizer: see build_index
+        - workers: number of processes, by default the number of CPUs
+        - chunkSize: number of windows of x per task, by default enough for about 4 tasks per worker
+    Output:
+        - index: KGramIndex with the same arrays as the one of build_index
+    """
+    #check empty string
+    if x == None:
+        raise Exception("String X cannot be empty!")
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    if normalizer is None:
+        normalizer = DEFAULT_NORMALIZER
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    xOffsets = None
+    if original:
+        x, xOffsets = normalizer.normalize(x, offsets = True)
+    else:
+        x = normalizer.normalize(x)
+
+    if chunkSize is None:
+        chunkSize = max(MIN_CHUNK, math.ceil(max(len(x) - k + 1, 0) / (4 * workers)))
+    shards = shard_windows(len(x), k, w, chunkSize)
+    buckets = len(shards)
+
+    index = KGramIndex(x, k, w, xOffsets)
+    with ProcessPoolExecutor(workers) as pool:
+        tasks = [(x[lo:hi], lo, start, end, k, w, buckets) for lo, hi, start, end in shards]
+        bucketed = list(pool.map(_bucket_shard, tasks))
+        #bucket b of every shard goes to the same task
+        tables = pool.map(_sort_bucket, [[parts[b] for parts in bucketed] for b in range(buckets)])
+
+        #concatenate the sorted buckets
+        for fingerprints, offsets, positions in tables:
+            base = len(index.positions)
+            index.fingerprints.extend(fingerprints)
+            index.offsets.extend(array('q', [o + base for o in offsets[1:]]))
+            index.positions.extend(positions)
+    return index
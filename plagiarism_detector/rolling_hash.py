@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Rabin-Karp Rolling Hash Engine
+
+# - Every k-length substring is turned into a polynomial in its character codes, evaluated under two
+#   different prime moduli close to 2^31 (Karp & Rabin, 1987).
+# - The two residues are packed into one 63-bit integer fingerprint, so the open addressing table sees
+#   keys that are spread over the whole 64-bit range instead of the ten keys the mod-10 hash produced.
+# - The power base^(k-1) is computed once per call, so sliding the window by one character costs O(1).
+
+
+from collections import deque
+
+#the two moduli are primes just below 2^31, so a product of two residues still fits in 62 bits
+MOD1 = 2147483647
+MOD2 = 2147483629
+#one base per modulus, both large primes smaller than the moduli
+BASE1 = 911382323
+BASE2 = 972663749
+
+#djb2 of the chaining table: seed and 32-bit mask, see iter_djb2
+DJB2_SEED = 5381
+DJB2_MASK = 0xFFFFFFFF
+
+
+def fingerprint(sub):
+    """
+    This function will produce the 64-bit fingerprint of a whole string.
+
+    Input:
+        - sub: string
+    Output:
+        - fp: int, the fingerprint of sub
+    """
+    h1 = 0
+    h2 = 0
+
+    #Horner's rule under both moduli
+    for char in sub:
+        code = ord(char)
+        h1 = (h1 * BASE1 + code) % MOD1
+        h2 = (h2 * BASE2 + code) % MOD2
+
+    #pack the two residues into one integer
+    return (h1 << 32) | h2
+
+def iter_fingerprints(x, k):
+    """
+    Generator of (position, fingerprint) for every k-length substring of x, using rolling hashing.
+    The fingerprint at position i is always equal to fingerprint(x[i:i+k]).
+    Both the insert side and the search side of the matchers share this stream.
+
+    Input:
+        - x: string
+        - k: length of substring
+    Output:
+        - yields tuples (i, fp) for i from 0 to len(x)-k
+    """
+    #no substring can be formed
+    if k <= 0 or len(x) < k:
+        return
+
+    #weight of the character that leaves the window
+    pow1 = pow(BASE1, k-1, MOD1)
+    pow2 = pow(BASE2, k-1, MOD2)
+
+    #calculate the hash value of first substring
+    h1 = 0
+    h2 = 0
+    for char in x[:k]:
+        code = ord(char)
+        h1 = (h1 * BASE1 + code) % MOD1
+        h2 = (h2 * BASE2 + code) % MOD2
+    yield 0, (h1 << 32) | h2
+
+    #start the rolling hashing from kth character
+    for i in range(k, len(x)):
+        old = ord(x[i-k])
+        new = ord(x[i])
+        #remove one character from the front and append one at the end
+        h1 = ((h1 - old * pow1) * BASE1 + new) % MOD1
+        h2 = ((h2 - old * pow2) * BASE2 + new) % MOD2
+        yield i-k+1, (h1 << 32) | h2
+
+def iter_djb2(x, k):
+    """
+    Generator of (position, hash) for every k-length substring of x, where the hash is bit-identical to
+    djb2_hash_function(x[i:i+k]) of the chaining table, in O(1) per window instead of O(k).
+    djb2 is Horner's rule with base 33 and seed 5381 modulo 2^32:
+        djb2(s) = 5381 * 33^k + sum of ord(s[t]) * 33^(k-1-t)   (mod 2^32)
+    so it rolls like the fingerprints, and dropping the first character also subtracts the seed's share.
+
+    Input:
+        - x: string
+        - k: length of substring
+    Output:
+        - yields tuples (i, hash) for i from 0 to len(x)-k
+    """
+    #no substring can be formed
+    if k <= 0 or len(x) < k:
+        return
+
+    mask = DJB2_MASK
+    #weight of the character that leaves the window, once multiplied by 33
+    out = pow(33, k, 1 << 32)
+    #the seed term 5381 * 33^k also gets multiplied by 33 on every roll, so put back the difference
+    reseed = (DJB2_SEED * out * (1 - 33)) & mask
+
+    #calculate the hash value of first substring
+    h = DJB2_SEED
+    for char in x[:k]:
+        h = (h * 33 + ord(char)) & mask
+    yield 0, h
+
+    #start the rolling hashing from kth character
+    for i in range(k, len(x)):
+        #remove one character from the front and append one at the end
+        h = (h * 33 - ord(x[i-k]) * out + ord(x[i]) + reseed) & mask
+        yield i-k+1, h
+
+def iter_chunk_fingerprints(chunks, k):
+    """
+    Same stream as iter_fingerprints for a string given as an iterable of chunks, e.g. read from a file.
+    The hash state and the last k characters are carried from one chunk to the next, so a k-gram
+    split between two chunks is found as if the string were in memory.
+
+    Input:
+        - chunks: iterable of strings
+        - k: length of substring
+    Output:
+        - yields tuples (i, fp, buf, c) where buf[c:c+k] is the substring at position i of the whole string;
+          buf is the current chunk after the tail of the previous ones, so no window is sliced
+    """
+    #no substring can be formed
+    if k <= 0:
+        return
+
+    #weight of the character that leaves the window
+    pow1 = pow(BASE1, k-1, MOD1)
+    pow2 = pow(BASE2, k-1, MOD2)
+
+    h1 = 0
+    h2 = 0
+    #characters seen so far
+    n = 0
+    #the last k characters of the previous chunks
+    tail = ""
+    for chunk in chunks:
+        buf = tail + chunk
+        c = len(tail)
+        #hash the first substring
+        while n < k and c < len(buf):
+            code = ord(buf[c])
+            h1 = (h1 * BASE1 + code) % MOD1
+            h2 = (h2 * BASE2 + code) % MOD2
+            n += 1
+            c += 1
+            if n == k:
+                yield 0, (h1 << 32) | h2, buf, c-k
+        #roll over the rest of the chunk; buf[c-k] is always in the tail or the chunk
+        for c in range(c, len(buf)):
+            old = ord(buf[c-k])
+            new = ord(buf[c])
+            h1 = ((h1 - old * pow1) * BASE1 + new) % MOD1
+            h2 = ((h2 - old * pow2) * BASE2 + new) % MOD2
+            n += 1
+            yield n-k, (h1 << 32) | h2, buf, c-k+1
+        tail = buf[-k:]
+
+def rolling_fingerprints(x, k):
+    """
+    This function will produce the fingerprint of every k-length substring using rolling hashing.
+
+    Input:
+        - x: string
+        - k: length of substring
+    Output:
+        - a list of fingerprints, one for each substring
+    """
+    return [fp for _, fp in iter_fingerprints(x, k)]
+
+def collision_probability(xWindows, yWindows):
+    """
+    Heuristic estimate of the chance that trusting the fingerprints alone reports a false match.
+    It models the fingerprints of different substrings as independent and uniform over the MOD1 * MOD2
+    possible values. BASE1 and BASE2 are fixed constants, not drawn at random, so this is not a guarantee:
+    strings can be crafted to collide.
+
+    Input:
+        - xWindows, yWindows: number of fingerprints of x and of y
+    Output:
+        - union bound over every pair that could collide: x with y, and x with itself when equal keys are merged
+    """
+    pairs = xWindows * yWindows + xWindows * (xWindows - 1) // 2
+    return min(1.0, pairs / (MOD1 * MOD2))
+
+def prefix_hashes(x):
+    """
+    Hash of every prefix of x under both moduli, computed in one pass.
+    The fingerprint of any substring can then be found in O(1), for any length, see prefix_fingerprints.
+
+    Input:
+        - x: string
+    Output:
+        - prefixes: (h1, h2), lists of len(x)+1 residues where h1[i] is the hash of x[:i] modulo MOD1
+    """
+    h1 = [0]
+    h2 = [0]
+    a = 0
+    b = 0
+    for char in x:
+        code = ord(char)
+        a = (a * BASE1 + code) % MOD1
+        b = (b * BASE2 + code) % MOD2
+        h1.append(a)
+        h2.append(b)
+    return h1, h2
+
+def prefix_fingerprints(prefixes, k):
+    """
+    Same as rolling_fingerprints(x, k), from the prefix hashes of x.
+    The hash of x[i:i+k] is h[i+k] - h[i] * base^k, so every k reuses the same prefixes.
+
+    Input:
+        - prefixes: the output of prefix_hashes(x)
+        - k: length of substring
+    Output:
+        - a list of fingerprints, one for each substring
+    """
+    h1, h2 = prefixes
+    if k <= 0 or len(h1) <= k:
+        return []
+    pow1 = pow(BASE1, k, MOD1)
+    pow2 = pow(BASE2, k, MOD2)
+    return [(((a1 - a0 * pow1) % MOD1) << 32) | ((b1 - b0 * pow2) % MOD2)
+            for a0, a1, b0, b1 in zip(h1, h1[k:], h2, h2[k:])]
+
+def check_window(w):
+    """
+    Raise an Exception unless w is a winnowing window size, at least 1.
+    """
+    if w < 1:
+        raise Exception("Winnowing window size must be at least 1!")
+
+def winnow(fingerprints, w):
+    """
+    Winnowing: from every w consecutive fingerprints keep the minimum (Schleimer et al., 2003).
+    Any substring of length at least w+k-1 shared by two strings has at least one
+    selected fingerprint in common, while only about 2/(w+1) of the fingerprints are kept.
+    When the minimum of a window is tied, the earlier selection is kept.
+
+    Input:
+        - fingerprints: iterable of (position, fingerprint), e.g. iter_fingerprints(x, k);
+          tuples with more fields, like the ones of iter_chunk_fingerprints, are passed through
+        - w: int, window size, at least 1
+    Output:
+        - yields the selected tuples in increasing position order
+    """
+    #checked here, not when the selection is first read
+    check_window(w)
+    return _winnow(fingerprints, w)
+
+def _winnow(fingerprints, w):
+    #candidates of the current window; their fingerprints never decrease from front to back
+    window = deque()
+    lastSelected = None
+    count = 0
+    for item in fingerprints:
+        pos = item[0]
+        fp = item[1]
+        #a candidate bigger than the new fingerprint can never be a minimum again
+        while window and window[-1][1] > fp:
+            window.pop()
+        window.append(item)
+        #drop the candidate that slid out of the window
+        if window[0][0] <= pos - w:
+            window.popleft()
+        count += 1
+        #select the minimum once the first window is complete
+        if count >= w and window[0][0] != lastSelected:
+            lastSelected = window[0][0]
+            yield window[0]
+
+    #a string with fewer than w fingerprints forms a single, shorter window
+    if 0 < count < w:
+        yield window[0]
+
+def fingerprint_stream(x, k, w = None):
+    """
+    The (position, fingerprint) stream of x used by the matchers:
+    every substring, or only the winnowed ones if a window w is given.
+    """
+    stream = iter_fingerprints(x, k)
+    if w is not None:
+        stream = winnow(stream, w)
+    return stream
+
+
+# Karp, R. M., Rabin, M. O. (1987). "Efficient randomized pattern-matching algorithms". IBM Journal of Research and Development, 31(2), 249-260.
+#
+# Schleimer, S., Wilkerson, D. S., Aiken, A. (2003). "Winnowing: local algorithms for document fingerprinting". Proceedings of SIGMOD 2003, 76-85.
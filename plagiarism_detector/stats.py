@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Match Statistics
+
+# - A MatchStats passed to rh_get_match or regular_get_match records why a comparison is slow: how many slots every
+#   open addressing lookup probed, how many nodes every chained lookup walked, how many substring comparisons only
+#   confirmed a hash collision, how full the table got, and how long each phase took.
+# - The phases are normalize (process_string), index (inserting x), query (searching y, including handing the
+#   matches to MatchCollector) and merge (MatchCollector.result: closing the spans and translating positions).
+# - It is opt-in: without one, the tables only test `stats is not None` once per lookup, never per probe, and
+#   the matchers skip the timers.
+
+
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+
+#returned by phase when there are no stats to update
+_NO_PHASE = nullcontext()
+
+
+class MatchStats:
+    '''
+    Counters and timings of one or more matcher calls; the counters add up when it is passed to several calls.
+    '''
+    def __init__(self):
+        #histograms: number of slots probed or nodes walked -> number of lookups
+        self.insert_probes = Counter()
+        self.search_probes = Counter()
+        self.insert_chains = Counter()
+        self.search_chains = Counter()
+        #substring comparisons made by searches to confirm a match, and the ones that only found a collision
+        self.comparisons = 0
+        self.collisions = 0
+        #table of the last call: filled slots or stored nodes, slots, number of times it grew
+        self.keys = 0
+        self.capacity = 0
+        self.resizes = 0
+        #phase name -> nanoseconds
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        #add the time spent in the with block to phase name
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter_ns() - start
+
+    def load_factor(self):
+        if self.capacity == 0:
+            return 0
+        return self.keys / self.capacity
+
+    def record_table(self, keys, capacity, resizes = 0):
+        self.keys = keys
+        self.capacity = capacity
+        self.resizes += resizes
+
+    def report(self):
+        """
+        Output:
+            - dictionary of every counter, with the histograms sorted and the phases in milliseconds,
+              ready for json.dump
+        """
+        def histogram(counts):
+            return {"lookups": sum(counts.values()), "mean": mean(counts), "max": max(counts, default=0),
+                    "counts": dict(sorted(counts.items()))}
+        return {"load_factor": self.load_factor(), "keys": self.keys, "capacity": self.capacity,
+                "resizes": self.resizes,
+                "insert_probes": histogram(self.insert_probes), "search_probes": histogram(self.search_probes),
+                "insert_chains": histogram(self.insert_chains), "search_chains": histogram(self.search_chains),
+                "comparisons": self.comparisons, "collisions": self.collisions,
+                "phases_ms": {name: ns / 1e6 for name, ns in self.phases.items()}}
+
+
+def mean(counts):
+    #mean of a histogram value -> count
+    total = sum(counts.values())
+    if total == 0:
+        return 0
+    return sum(value * count for value, count in counts.items()) / total
+
+def phase(stats, name):
+    """
+    Same as stats.phase(name), or a context that does nothing if stats is None.
+    """
+    if stats is None:
+        return _NO_PHASE
+    return stats.phase(name)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Streaming Queries
+
+# - rh_get_match needs y as one string and returns every match at the end, so y has to fit in memory twice.
+# - stream_get_match reads y as an iterable of chunks, such as a file read block by block. Each chunk is
+#   normalized on its own, the rolling hash carries its state from one chunk to the next, and the matches
+#   are yielded as soon as they are known.
+# - Memory stays bounded by the chunk size, the winnowing window and the spans still growing: a span is
+#   yielded as soon as a window of y fails to extend it, and only the offset map of the positions that
+#   can still be reported is kept.
+
+
+from array import array
+
+from .match_spans import SpanMerger, sorted_spans
+from .normalize import DEFAULT_NORMALIZER, to_original
+from .rolling_hash import iter_chunk_fingerprints, winnow
+
+
+#size of the blocks read by file_chunks, in characters
+CHUNK_SIZE = 1 << 20
+
+
+def file_chunks(path, chunkSize = CHUNK_SIZE, encoding = "utf-8"):
+    """
+    Read a text file block by block.
+
+    Input:
+        - path: file path
+        - chunkSize: number of characters per block
+        - encoding: encoding of the file
+    Output:
+        - yields the blocks as strings
+    """
+    with open(path, encoding=encoding) as f:
+        while True:
+            chunk = f.read(chunkSize)
+            if not chunk:
+                return
+            yield chunk
+
+
+class OffsetWindow:
+    '''
+    The offset map of the most recent part of a stream, indexed by position in the whole normalized stream.
+    '''
+    def __init__(self):
+        #position of offsets[0] in the normalized stream
+        self.base = 0
+        self.offsets = array('q')
+
+    def extend(self, offsets):
+        self.offsets.extend(offsets)
+
+    def discard(self, before):
+        #forget the positions smaller than before
+        if before > self.base:
+            del self.offsets[:before - self.base]
+            self.base = before
+
+    def __getitem__(self, p):
+        return self.offsets[p - self.base]
+
+
+def stream_get_match(index, chunks, spans = False, original = False, normalizer = None):
+    """
+    Finds all common substrings of an indexed string x and a string y given in chunks.
+
+    Input:
+        - index: KGramIndex from build_index or KGramIndex.load
+        - chunks: iterable of strings whose concatenation is y, e.g. file_chunks(path)
+        - spans, original, normalizer: see index_get_match
+    Output:
+        - yields the matches of index_get_match(index, "".join(chunks), ...) while y is read:
+          (i, j) pairs in the same order, or spans in the order they end
+    """
+    if normalizer is None:
+        normalizer = DEFAULT_NORMALIZER
+    k = index.k
+    if original and index.sourceOffsets is None:
+        raise Exception("The index was built without the offsets of the original string!")
+    xOffsets = index.sourceOffsets
+    yOffsets = OffsetWindow() if original else None
+    merger = SpanMerger(k)
+    #first position of y whose original offset may still be needed
+    keepFrom = 0
+
+    def normalized_chunks():
+        for normalized in normalizer.stream(chunks, original):
+            if original:
+                normalized, offsets = normalized
+                yOffsets.discard(keepFrom)
+                yOffsets.extend(offsets)
+            yield normalized
+
+    def finished(closed):
+        closed = sorted_spans(closed)
+        if original:
+            return [to_original(span, xOffsets, yOffsets) for span in closed]
+        return closed
+
+    stream = iter_chunk_fingerprints(normalized_chunks(), k)
+    if index.w is not None:
+        stream = winnow(stream, index.w)
+
+    for j, key, buf, c in stream:
+        #the window is only sliced if its fingerprint is in the index
+        indexes = index.search_at(key, buf, c)
+        if spans:
+            if indexes:
+                closed = merger.add(j, indexes)
+                if closed:
+                    yield from finished(closed)
+            elif merger.runs:
+                #no run goes past window j, so every open run is complete
+                yield from finished(merger.close())
+        elif indexes:
+            if original:
+                yPos = yOffsets[j]
+                for i in indexes:
+                    yield xOffsets[i], yPos
+            else:
+                for i in indexes:
+                    yield i, j
+        if original:
+            #later windows start after j, and the open spans start at their y_start
+            keepFrom = min([j + 1] + [run[1] for run in merger.runs.values()]) if merger.runs else j + 1
+
+    if spans:
+        yield from finished(merger.close())
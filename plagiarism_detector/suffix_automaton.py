@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Suffix Automaton
+
+# - The hash matchers compare substrings of one fixed length k, so finding the longest shared passages means
+#   running them again for every k.
+# - The suffix automaton of x is the smallest automaton that accepts every substring of x (Blumer et al., 1985).
+#   It has at most 2|x| states and is built in one pass over x.
+# - Every state stands for a set of substrings of x that end at the same positions of x. The suffix link of a
+#   state goes to the state of its longest suffix that ends at more positions, so the links form a tree where
+#   the end positions of a state are the ones found in its subtree.
+# - Reading y through the automaton gives, for every position p of y, the longest suffix of y[:p+1] that
+#   occurs in x. Walking up the suffix links from there finds every end position e in x together with the
+#   length of the longest common suffix of x[:e+1] and y[:p+1], so a common substring can never be
+#   extended to the left. It is a maximal match when it can't be extended to the right either.
+# - Reading y takes O(|y|) steps, plus one step per matching window of length k.
+# - maximal_matches doesn't list every end position. It numbers the end positions in depth-first order of the
+#   suffix link tree, so the ends of a state are one range, and jumps over the runs of ends that are followed
+#   by the same character in x: the ones followed by the next character of y extend to the right and are
+#   skipped a run at a time. The length of each reported match comes from a heavy-path decomposition of the
+#   tree, so it costs O(|y| + number of spans) steps of O(log |x|) each, whatever the number of matching windows.
+
+
+from .match_spans import sorted_spans
+
+
+class SuffixAutomaton:
+    '''
+    Suffix automaton of a string x, queried with other strings y.
+    '''
+    def __init__(self, x):
+        self.x = x
+        #per state: transitions, suffix link, length of its longest substring, first end position in x,
+        #and whether it was made by cloning; every other state was created by the prefix that ends at first
+        self.next = [{}]
+        self.link = [-1]
+        self.length = [0]
+        self.first = [-1]
+        self.cloned = [False]
+        #state of the whole string read so far
+        self.last = 0
+        for char in x:
+            self._extend(char)
+
+        #children of every state in the tree of suffix links
+        self.children = [[] for _ in self.next]
+        for state in range(1, len(self.next)):
+            self.children[self.link[state]].append(state)
+        #heavy-path decomposition of that tree, made by _index_ends on the first call to maximal_matches
+        self.order = None
+
+    def __len__(self):
+        #number of states
+        return len(self.next)
+
+    def _new_state(self, length, first, cloned = False):
+        self.next.append({})
+        self.link.append(-1)
+        self.length.append(length)
+        self.first.append(first)
+        self.cloned.append(cloned)
+        return len(self.next) - 1
+
+    def _extend(self, char):
+        #append one character to x
+        nxt = self.next
+        link = self.link
+        length = self.length
+        current = self._new_state(length[self.last] + 1, length[self.last])
+        state = self.last
+        while state != -1 and char not in nxt[state]:
+            nxt[state][char] = current
+            state = link[state]
+        if state == -1:
+            link[current] = 0
+        else:
+            target = nxt[state][char]
+            if length[state] + 1 == length[target]:
+                link[current] = target
+            else:
+                #split target so the shorter substrings get their own state
+                clone = self._new_state(length[state] + 1, self.first[target], True)
+                nxt[clone] = dict(nxt[target])
+                link[clone] = link[target]
+                while state != -1 and nxt[state].get(char) == target:
+                    nxt[state][char] = clone
+                    state = link[state]
+                link[target] = clone
+                link[current] = clone
+        self.last = current
+
+    def _ends(self, state, skip):
+        #end positions in the subtree of state, leaving out the subtree of skip
+        stack = [state]
+        while stack:
+            state = stack.pop()
+            if not self.cloned[state]:
+                yield self.first[state]
+            for child in self.children[state]:
+                if child != skip:
+                    stack.append(child)
+
+    def _index_ends(self):
+        #number the states and their end positions in depth-first order, heavy child first
+        children = self.children
+        states = len(self.next)
+        #number of states in the subtree of every state; a child is longer than its parent
+        size = [1] * states
+        for state in sorted(range(1, states), key=self.length.__getitem__, reverse=True):
+            size[self.link[state]] += size[state]
+
+        x = self.x
+        #order[pos[state]] = state; the states of a heavy path are consecutive, from its head down
+        self.order = []
+        self.pos = [0] * states
+        self.head = [0] * states
+        #ends[lo[state]:hi[state]] are the end positions of state, after[i] the character following ends[i]
+        #in x ("" at the end of x), and runs[i] the first index after i that is followed by another character
+        self.ends = []
+        self.lo = [0] * states
+        self.hi = [0] * states
+        stack = [0]
+        while stack:
+            state = stack.pop()
+            if state < 0:
+                #every descendant is numbered
+                self.hi[~state] = len(self.ends)
+                continue
+            self.pos[state] = len(self.order)
+            self.order.append(state)
+            self.lo[state] = len(self.ends)
+            if not self.cloned[state]:
+                self.ends.append(self.first[state])
+            stack.append(~state)
+            if children[state]:
+                heavy = max(children[state], key=size.__getitem__)
+                for child in children[state]:
+                    if child != heavy:
+                        self.head[child] = child
+                        stack.append(child)
+                #popped first, right after state
+                self.head[heavy] = self.head[state]
+                stack.append(heavy)
+
+        self.endState = [0] * len(x)
+        for state in range(1, states):
+            if not self.cloned[state]:
+                self.endState[self.first[state]] = state
+        self.after = [x[e+1] if e + 1 < len(x) else "" for e in self.ends]
+        self.runs = [len(self.ends)] * len(self.ends)
+        for i in range(len(self.ends) - 2, -1, -1):
+            self.runs[i] = self.runs[i+1] if self.after[i] == self.after[i+1] else i + 1
+
+    def _top(self, state, minLength):
+        #highest ancestor of state (or state itself) whose longest substring has at least minLength characters
+        length = self.length
+        while True:
+            head = self.head[state]
+            if length[head] < minLength:
+                #lengths grow down the heavy path, search it between head and state
+                lo = self.pos[head]
+                hi = self.pos[state]
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if length[self.order[mid]] >= minLength:
+                        hi = mid
+                    else:
+                        lo = mid + 1
+                return self.order[lo]
+            if length[self.link[head]] < minLength:
+                return head
+            state = self.link[head]
+
+    def _meet(self, u, v):
+        #lowest common ancestor of u and v in the tree of suffix links
+        head = self.head
+        pos = self.pos
+        while head[u] != head[v]:
+            if pos[head[u]] > pos[head[v]]:
+                u = self.link[head[u]]
+            else:
+                v = self.link[head[v]]
+        return u if pos[u] < pos[v] else v
+
+    def common_suffixes(self, y, minLength):
+        """
+        Read y through the automaton.
+
+        Input:
+            - y: string
+            - minLength: shortest common substring to report, at least 1
+        Output:
+            - yields (e, p, length) for every end position e in x and p in y where the longest common suffix
+              of x[:e+1] and y[:p+1] has at least minLength characters, in increasing order of p
+        """
+        nxt = self.next
+        link = self.link
+        length = self.length
+        state = 0
+        matched = 0
+        for p, char in enumerate(y):
+            #drop characters from the front until the match can be extended by char
+            while state and char not in nxt[state]:
+                state = link[state]
+                matched = length[state]
+            if char in nxt[state]:
+                state = nxt[state][char]
+                matched += 1
+
+            #every end position with its longest common suffix, longest first
+            current = state
+            common = matched
+            skip = None
+            while current > 0 and common >= minLength:
+                for e in self._ends(current, skip):
+                    yield e, p, common
+                skip = current
+                current = link[current]
+                common = length[current]
+
+    def window_matches(self, y, k):
+        """
+        Output:
+            - yields (j, indexes) for every window y[j:j+k] that occurs in x, in increasing order of j,
+              where indexes are the increasing start indexes of its occurrences in x
+        """
+        p = None
+        indexes = []
+        for e, q, _ in self.common_suffixes(y, k):
+            if q != p:
+                if indexes:
+                    yield p - k + 1, sorted(indexes)
+                p = q
+                indexes = []
+            indexes.append(e - k + 1)
+        if indexes:
+            yield p - k + 1, sorted(indexes)
+
+    def maximal_matches(self, y, minLength):
+        """
+        Output:
+            - list of spans (i, j, length) sorted by their start in y, one for every maximal common substring
+              x[i:i+length] = y[j:j+length] with length at least minLength
+        """
+        if self.order is None:
+            self._index_ends()
+        nxt = self.next
+        link = self.link
+        length = self.length
+        ends = self.ends
+        after = self.after
+        runs = self.runs
+        spans = []
+        state = 0
+        matched = 0
+        for p, char in enumerate(y):
+            while state and char not in nxt[state]:
+                state = link[state]
+                matched = length[state]
+            if char in nxt[state]:
+                state = nxt[state][char]
+                matched += 1
+            if matched < minLength:
+                continue
+
+            #the ends with a common suffix of at least minLength characters are the ones of top
+            top = self._top(state, minLength)
+            #the ends followed by this character of y extend to the right, so they are not maximal
+            following = y[p+1] if p + 1 < len(y) else None
+            i = self.lo[top]
+            hi = self.hi[top]
+            while i < hi:
+                if after[i] == following:
+                    i = runs[i]
+                    continue
+                e = ends[i]
+                #the longest common suffix ends at the state where the paths to state and to e meet
+                meet = self._meet(state, self.endState[e])
+                common = matched if meet == state else length[meet]
+                spans.append((e - common + 1, p - common + 1, common))
+                i += 1
+        return sorted_spans(spans)
+
+    def longest_match(self, y):
+        """
+        Output:
+            - (i, j, length) of a longest common substring of x and y, the first one in y,
+              or None if x and y have no character in common
+        """
+        nxt = self.next
+        link = self.link
+        length = self.length
+        best = None
+        state = 0
+        matched = 0
+        for p, char in enumerate(y):
+            while state and char not in nxt[state]:
+                state = link[state]
+                matched = length[state]
+            if char in nxt[state]:
+                state = nxt[state][char]
+                matched += 1
+                if best is None or matched > best[2]:
+                    best = (self.first[state] - matched + 1, p - matched + 1, matched)
+        return best
+
+
+# Blumer, A., Blumer, J., Haussler, D., Ehrenfeucht, A., Chen, M. T., Seiferas, J. (1985). "The smallest automaton recognizing the subwords of a text". Theoretical Computer Science, 40, 31-55.
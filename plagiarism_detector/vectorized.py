@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# ## Vectorized Fingerprints
+
+# - iter_fingerprints rolls the hash one character at a time in Python. With NumPy every fingerprint of a
+#   text is computed at once, and the fingerprints are the same integers as the ones of rolling_hash.py.
+# - Under a prime modulus M the window sum h_i = sum c[i+t] * B^(k-1-t) can be written with prefix sums:
+#     - S[n] = sum of c[t] * B^(-t) for t < n, where B^(-1) is the inverse of B modulo M
+#     - h_i = (S[i+k] - S[i]) * B^(i+k-1) mod M
+#   Every term is below 2^31, so S fits in 64 bits for texts of up to 2^32 characters, and a product of two
+#   residues fits in 63 bits.
+# - y is matched against x by sorting the fingerprints of x once and finding the range of every fingerprint
+#   of y with np.searchsorted. Every candidate pair is verified on the code points, so a fingerprint
+#   collision never produces a false match.
+# - NumPy is optional: load_numpy returns None when it is not installed, and the matchers fall back to
+#   the pure-Python path.
+
+
+from .match_spans import sorted_spans
+from .rolling_hash import BASE1, BASE2, MOD1, MOD2, check_window
+
+
+#number of characters compared at once while verifying the candidate pairs
+VERIFY_BLOCK = 1 << 20
+
+
+def load_numpy():
+    """
+    Output:
+        - the numpy module, or None if it is not installed
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def text_codes(np, x):
+    #code points of x, through the UTF-32 encoding so no Python loop is needed
+    return np.frombuffer(x.encode("utf-32-le", "surrogatepass"), dtype="<u4").astype(np.int64)
+
+def mod_powers(np, base, mod, n):
+    """
+    Output:
+        - int64 array of base^t % mod for t from 0 to n-1
+    """
+    powers = np.ones(n, dtype=np.int64)
+    #double the computed prefix at every step
+    length = 1
+    while length < n:
+        step = min(length, n - length)
+        powers[length:length+step] = powers[:step] * pow(base, length, mod) % mod
+        length += step
+    return powers
+
+def window_hashes(np, codes, k, base, mod):
+    """
+    Polynomial hash of every k-length window of codes under one modulus, see the notes at the top.
+
+    Output:
+        - int64 array, element i is the hash of codes[i:i+k]
+    """
+    n = len(codes)
+    inverse = pow(base, -1, mod)
+    #c[t] * B^(-t), so the sum of a window only needs one multiplication to be shifted into place
+    scaled = codes * mod_powers(np, inverse, mod, n) % mod
+    prefix = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(scaled, out=prefix[1:])
+    windows = (prefix[k:] - prefix[:n-k+1]) % mod
+    return windows * mod_powers(np, base, mod, n)[k-1:] % mod
+
+def code_fingerprints(np, codes, k):
+    """
+    Output:
+        - int64 array of the fingerprints of every k-length window of codes
+    """
+    if k <= 0 or len(codes) < k:
+        return np.zeros(0, dtype=np.int64)
+    #same packing as rolling_hash.fingerprint
+    return (window_hashes(np, codes, k, BASE1, MOD1) << 32) | window_hashes(np, codes, k, BASE2, MOD2)
+
+def vector_fingerprints(np, x, k):
+    """
+    Same as rolling_fingerprints(x, k), as an int64 array.
+    """
+    return code_fingerprints(np, text_codes(np, x), k)
+
+def vector_winnow(np, fingerprints, w):
+    """
+    Same selection as rolling_hash.winnow: the leftmost minimum of every w consecutive fingerprints.
+
+    Output:
+        - int64 array of the selected positions, increasing
+    """
+    check_window(w)
+    count = len(fingerprints)
+    if count == 0:
+        return np.zeros(0, dtype=np.int64)
+    #a string with fewer than w fingerprints forms a single, shorter window
+    if count < w:
+        return np.array([np.argmin(fingerprints)], dtype=np.int64)
+    windows = np.lib.stride_tricks.sliding_window_view(fingerprints, w)
+    #argmin returns the first minimum, like the ties of winnow
+    return np.unique(windows.argmin(axis=1) + np.arange(count - w + 1))
+
+
+def vector_matches(np, x, y, k, w = None):
+    """
+    Find the start indexes of every common length-k substring of two processed strings.
+
+    Input:
+        - x, y: processed strings
+        - k: int, length of substring
+        - w: if given, winnowing window, see rh_get_match
+    Output:
+        - xs, ys: int64 arrays where x[xs[n]:xs[n]+k] = y[ys[n]:ys[n]+k],
+          in increasing order of ys, then of xs, like the pairs of rh_get_match
+    """
+    xCodes = text_codes(np, x)
+    yCodes = text_codes(np, y)
+    xFingerprints = code_fingerprints(np, xCodes, k)
+    yFingerprints = code_fingerprints(np, yCodes, k)
+    if w is None:
+        xPositions = np.arange(len(xFingerprints))
+        yPositions = np.arange(len(yFingerprints))
+    else:
+        xPositions = vector_winnow(np, xFingerprints, w)
+        yPositions = vector_winnow(np, yFingerprints, w)
+        xFingerprints = xFingerprints[xPositions]
+        yFingerprints = yFingerprints[yPositions]
+
+    #a stable sort keeps the positions of equal fingerprints increasing
+    order = np.argsort(xFingerprints, kind="stable")
+    sortedFingerprints = xFingerprints[order]
+    #range of every fingerprint of y among the sorted fingerprints of x
+    lo = np.searchsorted(sortedFingerprints, yFingerprints, "left")
+    counts = np.searchsorted(sortedFingerprints, yFingerprints, "right") - lo
+
+    #one pair per element of each range
+    total = int(counts.sum())
+    ys = np.repeat(yPositions, counts)
+    ranks = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    xs = xPositions[order[np.repeat(lo, counts) + ranks]]
+    if total == 0:
+        return xs, ys
+
+    #verify the candidates block by block, to bound the memory of the compared windows
+    xWindows = np.lib.stride_tricks.sliding_window_view(xCodes, k)
+    yWindows = np.lib.stride_tricks.sliding_window_view(yCodes, k)
+    keep = np.empty(total, dtype=bool)
+    block = max(1, VERIFY_BLOCK // k)
+    for start in range(0, total, block):
+        end = start + block
+        keep[start:end] = (xWindows[xs[start:end]] == yWindows[ys[start:end]]).all(axis=1)
+    return xs[keep], ys[keep]
+
+def vector_spans(np, xs, ys, k):
+    """
+    Same spans as SpanMerger, from the pairs of vector_matches.
+
+    Output:
+        - list of spans (x_start, y_start, length) sorted by their start in y
+    """
+    if len(xs) == 0:
+        return []
+    diagonals = xs - ys
+    #walk every diagonal in increasing order of j
+    order = np.lexsort((ys, diagonals))
+    diagonals = diagonals[order]
+    xs = xs[order]
+    ys = ys[order]
+    #a run starts where the diagonal changes or the previous window is not the one right before
+    starts = np.ones(len(ys), dtype=bool)
+    starts[1:] = (diagonals[1:] != diagonals[:-1]) | (ys[1:] != ys[:-1] + 1)
+    first = np.flatnonzero(starts)
+    #a run of n windows covers n + k - 1 characters
+    lengths = np.diff(np.append(first, len(ys))) + k - 1
+    return sorted_spans(zip(xs[first].tolist(), ys[first].tolist(), lengths.tolist()))
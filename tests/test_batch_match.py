@@ -0,0 +1,26 @@
+from plagiarism_detector import all_pairs_get_match, batch_match, rh_get_match
+
+
+#test every pair of submissions is compared in one pass, with the same matches as rh_get_match
+def test_all_pairs():
+    submissions = {"a": "The legal system is made up of civil courts",
+                   "b": "Each court has its own jurisdiction",
+                   "c": "The legal system: each court has its own rules",
+                   "d": "Normal science"}
+    pairs = all_pairs_get_match(submissions, 8)
+    assert([(a, b) for a, b, _, _ in pairs]) == [("b", "c"), ("a", "c")]
+    for a, b, similarity, matches in pairs:
+        assert(matches) == rh_get_match(submissions[a], submissions[b], 8, spans=True)
+        assert(0 < similarity < 1)
+    assert(all_pairs_get_match(submissions, 8, spans=False)[0][3]) == rh_get_match(submissions["b"], submissions["c"], 8)
+    #a k-gram found in more than maxDocuments documents is ignored
+    assert(all_pairs_get_match({"a": "boilerplate", "b": "boilerplate", "c": "boilerplate"}, 8, maxDocuments=2)) == []
+
+
+#test substrings sharing a fingerprint are told apart without slicing every posting
+def test_all_pairs_collisions(monkeypatch):
+    submissions = {"a": "The legal system is made up of civil courts", "b": "The legal system: each court has its own rules"}
+    expected = all_pairs_get_match(submissions, 8)
+    #every k-gram of every document gets the same fingerprint
+    monkeypatch.setattr(batch_match, "fingerprint_stream", lambda text, k, w: ((i, 0) for i in range(len(text) - k + 1)))
+    assert([matches for _, _, _, matches in all_pairs_get_match(submissions, 8)]) == [expected[0][3]]
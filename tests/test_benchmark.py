@@ -0,0 +1,58 @@
+import json
+
+from benchmark import CORPORA, compare_reports, measure, percentile, run_suite
+
+
+#test percentiles use the nearest rank
+def test_percentile():
+    assert(percentile([5, 1, 4, 2, 3], 50)) == 3
+    assert(percentile(list(range(1, 101)), 95)) == 95
+    assert(percentile([7], 95)) == 7
+
+
+#test measure times the requested number of runs and traces one more
+def test_measure():
+    calls = []
+    timing = measure(calls.append, 1, warmup = 2, repeat = 3)
+    assert(len(calls)) == 2 + 3 + 1
+    assert(len(timing["samples_ns"])) == 3
+    assert(timing["min_ns"] <= timing["median_ns"] <= timing["p95_ns"])
+    assert(timing["peak_bytes"]) is not None
+    assert(measure(calls.append, 1, memory = False)["peak_bytes"]) is None
+
+
+#test every corpus has the requested length
+def test_corpora():
+    for name, corpus in CORPORA.items():
+        x, y = corpus(1234, 0)
+        assert(len(x), len(y)) == (1234, 1234)
+    #the repetition of the plagiarized and repetitive corpora can be set
+    x, y = CORPORA["plagiarized"](1000, 0, copied=0.0)
+    assert(x[:100] not in y)
+    x, y = CORPORA["repetitive"](1000, 0, period=10)
+    assert(x) == y == x[:10] * 100
+
+
+#test every engine of the suite finds the same matches, and the report survives JSON
+def test_run_suite():
+    report = run_suite(lengths = (300,), warmup = 0, repeat = 1, memory = False)
+    report = json.loads(json.dumps(report))
+    for corpus in CORPORA:
+        matches = {result["matches"] for result in report["results"] if result["corpus"] == corpus}
+        assert(len(matches)) == 1
+    assert(compare_reports(report, report)) == []
+    report = run_suite(engines = ["hash"], corpora = ["repetitive"], lengths = (300,), warmup = 0, repeat = 1,
+                       memory = False, copied = 0.5, period = 50)
+    assert(report["copied"], report["period"]) == (0.5, 50)
+    #every window of y also matches the copies of its block, not only its own position
+    assert(report["results"][0]["matches"]) > 5 * (300 - 8 + 1)
+
+
+#test a slower median or a different number of matches is a regression
+def test_compare_reports():
+    result = {"engine": "hash", "corpus": "prose", "length": 100, "median_ns": 1000, "matches": 5}
+    baseline = {"k": 8, "spans": False, "results": [result]}
+    slower = {"k": 8, "spans": False, "results": [dict(result, median_ns=1200)]}
+    assert(compare_reports(baseline, slower)) == [("hash", "prose", 100, 1000, 1200)]
+    assert(compare_reports(baseline, slower, tolerance = 0.5)) == []
+    assert(compare_reports(baseline, {"k": 8, "spans": False, "results": [dict(result, matches=4)]}))
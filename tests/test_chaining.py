@@ -0,0 +1,53 @@
+from plagiarism_detector.chaining import HashTable, chained_table_size, regular_get_match
+from plagiarism_detector.rolling_hash import iter_djb2
+
+#real-life plagism example(Direct Plagiarism, 2021)
+text = "Normal science, the activity in which most scientists inevitably spend almost all their time,         is predicated on the assumption that the scientific community knows what the world is like."
+
+
+#test duplicates handling
+def test_duplicates():
+    assert(regular_get_match("Today is Monday", "day", 3)) == [(2, 0), (10, 0)]
+
+
+#test blank space, capitlized letters, and special characters
+def test_blank_space_and_case():
+    assert(regular_get_match("Ha HA hA h.Apple ", "ha", 2)) == [(0,0), (2, 0), (4, 0)]
+
+
+#test real-life plagism examples(Direct Plagiarism, 2021)
+def test_real_life_plagiarism():
+    assert(regular_get_match(text, text, 10)) == [(i,i) for i in range(148)]
+
+
+#test table sizes are the smallest power of 2 that fits the string
+def test_table_sizes():
+    assert([chained_table_size(n) for n in range(1, 10)]) == [1, 2, 4, 4, 8, 8, 8, 8, 16]
+    assert(all(chained_table_size(n) & (chained_table_size(n) - 1) == 0 for n in range(1, 5000)))
+    assert(chained_table_size(10**6)) == 2**20
+
+
+#test overlapping matches are coalesced into maximal spans (x_start, y_start, length)
+def test_spans():
+    assert(regular_get_match(text, text, 10, spans=True)) == [(0, 0, 157)]
+    assert(regular_get_match("abcxabcd", "zabcdz", 3, spans=True)) == [(0, 1, 3), (4, 1, 4)]
+
+
+#test the position-only chains keep no substring and still tell apart substrings with the same hash
+def test_position_chains():
+    table = HashTable(1, text="abcabd", k=3)
+    table.chained_position_insert(7, 0)
+    table.chained_position_insert(7, 3)
+    table.chained_position_insert(7, 0)
+    assert(table.node_count()) == 2
+    assert(table.hash_table[0].value) is None and table.node_text(table.hash_table[0]) == "abc"
+    assert(table.chained_position_search(7, "abd", 0)) == [3]
+    assert(table.chained_position_search(7, "abe", 0)) == False
+
+
+#test the rolling djb2 gives every window the same hash as djb2_hash_function, including non-BMP characters
+def test_rolling_djb2():
+    table = HashTable(1)
+    for x, k in ((text, 1), (text, 12), ("ab\U0001F600cd\u00e9" * 5, 4), ("abc", 3)):
+        assert(list(iter_djb2(x, k))) == [(i, table.djb2_hash_function(x[i:i+k])) for i in range(len(x)-k+1)]
+    assert(list(iter_djb2("abc", 4))) == [] and list(iter_djb2("abc", 0)) == []
@@ -0,0 +1,54 @@
+from plagiarism_detector import CorpusIndex
+from plagiarism_detector.corpus_index import Segment
+
+
+def make_corpus():
+    corpus = CorpusIndex(8)
+    corpus.add_document("text1", "The legal system is made up of civil courts")
+    corpus.add_document("text2", "Each court has its own jurisdiction")
+    corpus.add_document("text3", "Normal science")
+    return corpus
+
+
+#test a corpus of several documents never matches across the boundary between two documents
+def test_no_match_across_documents():
+    corpus = make_corpus()
+    assert(corpus.query("courts. Each court has a jurisdiction")) == {"text2": [(0, 7, 12), (18, 20, 12)]}
+    assert(corpus.query("civil courtsEach court")) == {"text1": [(24, 0, 11)], "text2": [(0, 11, 9)]}
+    assert(corpus.query("Each court", original=True)) == {"text2": [(0, 0, 10, 10)]}
+
+
+#test documents can be removed and added again without rebuilding the corpus index
+def test_remove_and_add_documents():
+    corpus = make_corpus()
+    corpus.remove_document("text2")
+    assert(corpus.query("civil courtsEach court")) == {"text1": [(24, 0, 11)]}
+    corpus.compact()
+    assert(len(corpus.segments)) == 1 and "text2" not in corpus
+    corpus.add_document("text2", "Each court has its own jurisdiction")
+    assert(corpus.query("civil courtsEach court")) == {"text1": [(24, 0, 11)], "text2": [(0, 11, 9)]}
+
+
+
+#test documents added while a compaction runs don't make it drop its work
+def test_add_during_compaction(monkeypatch):
+    corpus = CorpusIndex(8)
+    for n in range(41):
+        corpus.add_document(n, "%d is the number of this reference document" % (1000 + n))
+        corpus.build()
+    for n in range(20):
+        corpus.remove_document(n)
+    merge = Segment.merge
+    found = []
+    def merge_and_add(cls, segments, deleted):
+        #the first call is the compaction: meanwhile flush a document whose segment merges with the last one
+        monkeypatch.setattr(Segment, "merge", merge)
+        corpus.add_document(41, "1041 is the number of this reference document")
+        found.append(corpus.query("1041 is the"))
+        return merge(segments, deleted)
+    monkeypatch.setattr(Segment, "merge", classmethod(merge_and_add))
+    corpus.compact(background=True).join()
+    assert(found) == [{41: [(0, 0, 9)]}]
+    windows = len("1000isthenumberofthisreferencedocument") - 8 + 1
+    assert(sum(len(segment) for segment in corpus.segments)) == 22 * windows
+    assert(corpus.query("1040 is the")) == {40: [(0, 0, 9)]}
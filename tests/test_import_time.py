@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+#seconds that importing the package may take; it measures about 0.04 s, the rest is headroom for slow machines
+IMPORT_BUDGET = 0.25
+
+#modules that only the entry points that need them may import
+HEAVY_MODULES = ("numpy", "matplotlib", "multiprocessing", "concurrent.futures")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#run in a fresh interpreter, so no module is already loaded by the other tests
+SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+import plagiarism_detector
+print(time.perf_counter() - start)
+print(",".join(name for name in %r if name in sys.modules))
+''' % (HEAVY_MODULES,)
+
+
+def import_package():
+    #the best of a few runs, so a busy machine does not fail the test
+    runs = []
+    for _ in range(3):
+        result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=ROOT, capture_output=True, text=True, check=True)
+        runs.append(result.stdout.split("\n"))
+    return min(float(out[0]) for out in runs), runs[0][1], runs[0]
+
+
+#test importing the package runs nothing and imports no heavy dependency
+def test_import_has_no_side_effects():
+    _, loaded, output = import_package()
+    assert(loaded) == ""
+    #only the two lines printed by SCRIPT
+    assert(output[2:]) == [""]
+
+
+#test importing the package stays within the import-time budget
+def test_import_time_budget():
+    elapsed, _, _ = import_package()
+    assert(elapsed) < IMPORT_BUDGET
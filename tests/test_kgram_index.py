@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+from plagiarism_detector import KGramIndex, build_index, compact_get_match, fingerprint, index_get_match, rh_get_match
+
+#real-life plagism example(Direct Plagiarism, 2021)
+text = "Normal science, the activity in which most scientists inevitably spend almost all their time,         is predicated on the assumption that the scientific community knows what the world is like."
+
+
+#test the array-backed index gives the same matches as the hash table
+def test_same_matches_as_hash_table():
+    assert(compact_get_match("Today is Monday", "day", 3)) == [(2, 0), (10, 0)]
+    assert(compact_get_match("Ha HA hA h.Apple ", "ha", 2)) == [(0,0), (2, 0), (4, 0)]
+    assert(compact_get_match(text, text, 10)) == rh_get_match(text, text, 10)
+
+
+#test an index saved to disk answers the same queries once mapped back into memory
+def test_saved_index():
+    indexPath = os.path.join(tempfile.mkdtemp(), "text.kgi")
+    build_index(text, 10, original=True).save(indexPath)
+    with KGramIndex.load(indexPath) as mapped:
+        assert(index_get_match(mapped, text)) == [(i,i) for i in range(148)]
+        assert(index_get_match(mapped, "Most scientists inevitably spend", spans=True, original=True)) == compact_get_match(text, "Most scientists inevitably spend", 10, spans=True, original=True)
+    os.remove(indexPath)
+
+
+
+#test a window of y is found in the index without slicing it first, and matches the sliced search
+def test_search_at():
+    index = build_index(text, 10)
+    y = "xx" + text.replace(" ", "").lower()
+    for j in range(0, 60, 7):
+        key = fingerprint(y[j:j+10])
+        assert(index.search_at(key, y, j)) == index.search(key, y[j:j+10])
+    assert(index_get_match(index, text, collisionProbability=1e-9)) == index_get_match(index, text)
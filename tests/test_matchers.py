@@ -0,0 +1,66 @@
+from plagiarism_detector import (ENGINES, SuffixAutomaton, choose_engine, get_match, merge_get_match,
+                                 multi_get_match, rh_get_match, rolling_fingerprints, sam_get_match,
+                                 vector_get_match)
+from plagiarism_detector.rolling_hash import prefix_fingerprints, prefix_hashes
+from plagiarism_detector.vectorized import load_numpy, vector_fingerprints
+
+#real-life plagism example(Direct Plagiarism, 2021)
+text = "Normal science, the activity in which most scientists inevitably spend almost all their time,         is predicated on the assumption that the scientific community knows what the world is like."
+
+
+#test the NumPy matcher, or its fallback without NumPy, returns the same matches as rh_get_match
+def test_vector_engine():
+    for w in (None, 4):
+        for spans in (False, True):
+            for original in (False, True):
+                assert(vector_get_match(text, text[40:], 5, spans, w, original)) == rh_get_match(text, text[40:], 5, spans, w, original)
+    assert(vector_get_match("Today is Monday", "day", 3)) == [(2, 0), (10, 0)]
+    assert(vector_get_match("Today", "Today is Monday", 8)) == []
+    if load_numpy() is not None:
+        #bit-identical fingerprints
+        assert(vector_fingerprints(load_numpy(), text, 10).tolist()) == rolling_fingerprints(text, 10)
+
+
+#test the sort-merge join and every engine of get_match return the same matches as rh_get_match
+def test_merge_join_and_engines():
+    for w in (None, 4):
+        for spans in (False, True):
+            for engine in ENGINES:
+                assert(get_match(text, text[40:], 5, spans, w, engine=engine)) == rh_get_match(text, text[40:], 5, spans, w)
+    assert(merge_get_match("Today is Monday", "day", 3)) == [(2, 0), (10, 0)]
+    assert(merge_get_match("Ha HA hA h.Apple ", "ha", 2)) == [(0,0), (2, 0), (4, 0)]
+    assert(get_match("Today is Monday", "day", 3)) == [(2, 0), (10, 0)]
+    assert(choose_engine(10, 10)) == "merge"
+
+
+#test the suffix automaton finds the same matches as rh_get_match, for any minimum length
+def test_suffix_automaton():
+    for k in (1, 5, 20):
+        for spans in (False, True):
+            for original in (False, True):
+                assert(sam_get_match(text, text[40:], k, spans, original)) == rh_get_match(text, text[40:], k, spans, original=original)
+    assert(sam_get_match("Today is Monday", "day", 3)) == [(2, 0), (10, 0)]
+    assert(sam_get_match("Ha HA hA h.Apple ", "ha", 2)) == [(0,0), (2, 0), (4, 0)]
+    assert(SuffixAutomaton("thelegalsystem").longest_match("thesystemislegal")) == (8, 3, 6)
+    assert(SuffixAutomaton("abc").longest_match("xyz")) == None
+    assert(sam_get_match("abc", "abc", 0)) == [] and sam_get_match("abc", "abc", 0, spans=True) == []
+
+
+#test the maximal matches skip the windows that extend to the right, even with many matching windows
+def test_suffix_automaton_repeats():
+    x = "abcab" * 40 + "x" + "abcab" * 40
+    y = "cabca" * 30 + "y" + "bcabc" * 30
+    for k in (1, 4, 5):
+        assert(sam_get_match(x, y, k, spans=True)) == rh_get_match(x, y, k, spans=True)
+    assert(SuffixAutomaton("aaaa").maximal_matches("aaa", 2)) == [(0, 0, 3), (1, 0, 3), (2, 0, 2), (0, 1, 2)]
+
+
+#test several values of k in one call return the same matches as one rh_get_match per k
+def test_multi_k():
+    assert(prefix_fingerprints(prefix_hashes(text), 10)) == rolling_fingerprints(text, 10)
+    for w in (None, 4):
+        for spans in (False, True):
+            for original in (False, True):
+                assert(multi_get_match(text, text[40:], (3, 8, 20), spans, w, original)) == {k: rh_get_match(text, text[40:], k, spans, w, original) for k in (3, 8, 20)}
+    assert(multi_get_match("Today is Monday", "day", (3, 4, 0))) == {3: [(2, 0), (10, 0)], 4: [], 0: []}
+ 
@@ -0,0 +1,125 @@
+from array import array
+
+import pytest
+
+from plagiarism_detector import KGramIndex, Normalizer, STRICT_RULES, compact_get_match
+from plagiarism_detector.open_addressing import (HashTable, _hash, is_prime, process_string, rh_get_match,
+                                                 rolling_hashing, rolling_table_size)
+from plagiarism_detector.rolling_hash import collision_probability, iter_fingerprints
+
+#real-life plagism example(Direct Plagiarism, 2021)
+text = "Normal science, the activity in which most scientists inevitably spend almost all their time,         is predicated on the assumption that the scientific community knows what the world is like."
+
+
+#test duplicates handling
+def test_duplicates():
+    assert(rh_get_match("Today is Monday", "day", 3)) == [(2, 0), (10, 0)]
+
+
+#test blank space, capitlized letters, and special characters
+def test_blank_space_and_case():
+    assert(rh_get_match("Ha HA hA h.Apple ", "ha", 2)) == [(0,0), (2, 0), (4, 0)]
+
+
+#test real-life plagism examples(Direct Plagiarism, 2021)
+def test_real_life_plagiarism():
+    assert(rh_get_match(text, text, 10)) == [(i,i) for i in range(148)]
+
+
+#test rolling hash values agree with hashing every substring from scratch
+def test_rolling_hash_values():
+    assert(rolling_hashing("todayismonday", 3)) == [_hash("todayismonday"[i:i+3]) for i in range(11)]
+
+
+#test the query side yields the same fingerprint stream, including strings shorter than k
+def test_query_fingerprint_stream():
+    assert(list(iter_fingerprints("day", 3))) == [(0, _hash("day"))]
+    assert(rh_get_match("Today is Monday", "da", 3)) == []
+
+
+#test the table grows instead of filling up, and keeps every key searchable
+def test_table_grows():
+    table = HashTable(3)
+    for i in range(100):
+        table.open_addressing_insert(_hash(str(i)), str(i), i)
+    assert(table.size) == 100
+    assert(table.load_factor()) <= table.max_load
+    assert(all(table.open_addressing_search(_hash(str(i)), str(i)) == [i] for i in range(100)))
+    assert(table.probes_per_lookup()) >= 1
+
+
+#test tables are prime-sized, grow when a probe sequence runs out, and don't grow for a duplicate
+def test_table_never_fills():
+    table = HashTable(12)
+    assert(table.capacity) == 13
+    for i in range(5):
+        table.open_addressing_insert(6 * i, str(i), i)
+    assert(all(table.open_addressing_search(6 * i, str(i)) == [i] for i in range(5)))
+    table = HashTable(3, max_load=None)
+    for i in range(10):
+        table.position_insert(i, i, verify=False)
+    assert(table.size) == 10 and table.capacity >= 10
+    table = HashTable(5)
+    for i in range(4):
+        table.open_addressing_insert(i, str(i), i)
+    capacity = table.capacity
+    table.open_addressing_insert(3, "3", 4)
+    assert(table.capacity, table.resizes, table.open_addressing_search(3, "3")) == (capacity, 0, [3, 4])
+
+
+#test table sizes are primes at least 1.3 times the number of keys
+def test_table_sizes():
+    assert(all(is_prime(rolling_table_size(n)) and rolling_table_size(n) >= int(1.3 * n) for n in range(0, 5000)))
+    assert([n for n in range(100) if is_prime(n)]) == [n for n in range(100) if all(n % d for d in range(2, n))][2:]
+    assert(is_prime(2147483647)) and not is_prime(2147483647 * 2147483629)
+    assert(rolling_table_size(10)) == 13
+
+
+#test overlapping matches are coalesced into maximal spans (x_start, y_start, length)
+def test_spans():
+    assert(rh_get_match(text, text, 10, spans=True)) == [(0, 0, 157)]
+    assert(rh_get_match("Today is Monday", "day", 3, spans=True)) == [(2, 0, 3), (10, 0, 3)]
+    assert(rh_get_match("abcxabcd", "zabcdz", 3, spans=True)) == [(0, 1, 3), (4, 1, 4)]
+    assert(compact_get_match("abcxabcd", "zabcdz", 3, spans=True)) == [(0, 1, 3), (4, 1, 4)]
+
+
+#test winnowing still finds every common substring of length w+k-1 or more, with a smaller index
+def test_winnowing():
+    copied = "is predicated on the assumption that"
+    assert(rh_get_match(text, "Paraphrased, " + copied + " in our essay.", 8, w=4))
+    assert(compact_get_match(text, "Paraphrased, " + copied + " in our essay.", 8, w=4)) == rh_get_match(text, "Paraphrased, " + copied + " in our essay.", 8, w=4)
+    assert(set(rh_get_match(text, text, 8, w=4))) < set(rh_get_match(text, text, 8))
+    assert(len(KGramIndex.from_text("todayismonday" * 5, 3, 4))) < len(KGramIndex.from_text("todayismonday" * 5, 3))
+    for w in (0, -1):
+        for matcher in (rh_get_match, compact_get_match):
+            with pytest.raises(Exception, match="at least 1"):
+                matcher(text, text, 8, w=w)
+
+
+#test matches can be reported in positions of the original strings
+def test_original_positions():
+    assert(process_string("Ha HA", "h A", offsets=True)) == ("haha", "ha", array('q', [0, 1, 3, 4]), array('q', [0, 2]))
+    assert(rh_get_match("Today is Monday", "It is day", 3, original=True)) == [(2, 6), (12, 6)]
+    assert(rh_get_match("Today is Monday", "It is day", 3, spans=True, original=True)) == [(2, 6, 3, 3), (12, 6, 3, 3)]
+    assert(compact_get_match("a b c d", "xx abc d", 3, spans=True, original=True)) == [(0, 3, 7, 5)]
+
+
+#test a stricter normalization removes tabs, newlines, punctuation and accents in the same pass
+def test_strict_normalizer():
+    strict = Normalizer(STRICT_RULES)
+    assert(process_string("Café,\tthe\nworld", "cafe the world!", normalizer=strict)) == ("cafetheworld", "cafetheworld")
+    assert(rh_get_match("Normal  science,\nthe activity", "normal science - the activity", 8, spans=True, normalizer=strict)) == [(0, 0, 24)]
+    assert(rh_get_match("Normal  science,\nthe activity", "normal science - the activity", 8, spans=True)) == [(0, 0, 13), (15, 14, 11)]
+
+
+#test the position-only table verifies equal fingerprints against the text, unless told to trust them
+def test_position_table():
+    table = HashTable(7, text="abcabd", k=3)
+    #give two different substrings the same fingerprint
+    table.position_insert(5, 0)
+    table.position_insert(5, 3)
+    assert(table.size) == 2
+    assert(table.position_search(5, "xabd", 1)) == [3]
+    assert(table.position_search(5, "xabc", 1, verify=False)) == [0]
+    assert(rh_get_match(text, text[40:], 8, collisionProbability=1e-9)) == rh_get_match(text, text[40:], 8)
+    assert(collision_probability(10, 10)) < 1e-15 and collision_probability(10**10, 10**10) == 1.0
@@ -0,0 +1,22 @@
+from plagiarism_detector import (build_index, index_get_match, parallel_build_index, parallel_get_match,
+                                 parallel_query)
+
+#real-life plagism example(Direct Plagiarism, 2021)
+text = "Normal science, the activity in which most scientists inevitably spend almost all their time,         is predicated on the assumption that the scientific community knows what the world is like."
+
+
+#test a query split between worker processes returns the same matches as the serial one
+def test_parallel_query():
+    for w in (None, 4):
+        index = build_index(text, 5, w, original=True)
+        for spans in (False, True):
+            assert(parallel_get_match(index, text[40:], spans, workers=2, chunkSize=7)) == index_get_match(index, text[40:], spans)
+        assert(parallel_query(index, [text, "the scientific world"], True, True, workers=2, chunkSize=7)) == [index_get_match(index, y, True, True) for y in (text, "the scientific world")]
+
+
+#test an index built by worker processes has the same arrays as the serial one
+def test_parallel_build_index():
+    for w in (None, 4):
+        index = build_index(text, 5, w)
+        shardedIndex = parallel_build_index(text, 5, w, workers=2, chunkSize=7)
+        assert(shardedIndex.fingerprints, shardedIndex.offsets, shardedIndex.positions) == (index.fingerprints, index.offsets, index.positions)
@@ -0,0 +1,47 @@
+from plagiarism_detector import MatchStats, regular_get_match, rh_get_match
+from plagiarism_detector.chaining import HashTable as ChainedHashTable
+from plagiarism_detector.open_addressing import HashTable
+
+#real-life plagism example(Direct Plagiarism, 2021)
+text = "Normal science, the activity in which most scientists inevitably spend almost all their time,         is predicated on the assumption that the scientific community knows what the world is like."
+
+
+#test the stats do not change the matches, and count every lookup of both matchers
+def test_matchers_record_stats():
+    for get_match, inserts, searches in ((rh_get_match, "insert_probes", "search_probes"),
+                                         (regular_get_match, "insert_chains", "search_chains")):
+        stats = MatchStats()
+        assert(get_match(text, text[40:], 8, stats=stats)) == get_match(text, text[40:], 8)
+        report = stats.report()
+        assert(report[inserts]["lookups"]) == len(text.replace(" ", "")) - 8 + 1
+        assert(report[searches]["lookups"]) == len(text[40:].replace(" ", "")) - 8 + 1
+        assert(0 < report["load_factor"] <= 1)
+        assert(report["comparisons"] - report["collisions"]) == len(get_match(text, text[40:], 8))
+        assert(set(report["phases_ms"])) == {"normalize", "index", "query", "merge"}
+
+
+#test a search that meets the same fingerprint with another substring counts a collision
+def test_open_addressing_collision():
+    stats = MatchStats()
+    table = HashTable(7, stats=stats)
+    table.open_addressing_insert(5, "abc", 0)
+    assert(table.open_addressing_search(5, "abd")) == False
+    assert(table.open_addressing_search(5, "abc")) == [0]
+    assert(stats.comparisons, stats.collisions) == (2, 1)
+    assert(stats.search_probes) == {2: 1, 1: 1}
+
+
+#test the chained searches count the nodes walked before the match
+def test_chain_lengths():
+    stats = MatchStats()
+    #one slot, so every substring lands in the same chain
+    table = ChainedHashTable(1, stats=stats)
+    for i, value in enumerate(("ab", "cd", "ef")):
+        table.chained_hash_insert(value, i)
+    assert(stats.insert_chains) == {0: 1, 1: 1, 2: 1}
+    assert(table.chained_hash_search("ef")) == [2]
+    assert(table.chained_hash_search("gh")) == False
+    assert(stats.search_chains) == {3: 2}
+    #only the node with the same hash is compared
+    assert(stats.comparisons, stats.collisions) == (1, 0)
+    assert(table.node_count()) == 3
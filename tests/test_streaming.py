@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+from plagiarism_detector import build_index, file_chunks, index_get_match, stream_get_match
+from plagiarism_detector.match_spans import sorted_spans
+
+#real-life plagism example(Direct Plagiarism, 2021)
+text = "Normal science, the activity in which most scientists inevitably spend almost all their time,         is predicated on the assumption that the scientific community knows what the world is like."
+
+
+#test y read from a file in small blocks gives the same matches as y in memory
+def test_file_chunks():
+    fd, textPath = tempfile.mkstemp()
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    for w in (None, 4):
+        index = build_index(text[20:90], 5, w, original=True)
+        assert(list(stream_get_match(index, file_chunks(textPath, chunkSize=7)))) == index_get_match(index, text)
+        assert(sorted_spans(stream_get_match(index, file_chunks(textPath, chunkSize=7), spans=True, original=True))) == index_get_match(index, text, spans=True, original=True)
+    os.remove(textPath)